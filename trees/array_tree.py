@@ -0,0 +1,475 @@
+from array import array
+from collections import deque
+
+# Отсутствующий узел (аналог None у узлов-объектов)
+NIL = -1
+
+
+class ArrayBST:
+    """Обычное BST, где узлы - целые индексы в типизированных массивах"""
+
+    def __init__(self, key_typecode="q"):
+        # Структура массивов: i-й элемент каждого массива относится к узлу i
+        self.keys = array(key_typecode)
+        self.left = array("q")
+        self.right = array("q")
+        self.parent = array("q")
+        self.root = NIL
+        self.size = 0
+        # Освобожденные слоты связаны в список через массив left
+        self._free = NIL
+
+    def __len__(self):
+        return self.size
+
+    def _extend(self):
+        """Добавить слот в дополнительные массивы наследников"""
+        pass
+
+    def _new_node(self, key, parent):
+        node = self._free
+        if node != NIL:
+            self._free = self.left[node]
+            self.keys[node] = key
+            self.left[node] = NIL
+            self.right[node] = NIL
+            self.parent[node] = parent
+        else:
+            node = len(self.keys)
+            self.keys.append(key)
+            self.left.append(NIL)
+            self.right.append(NIL)
+            self.parent.append(parent)
+            self._extend()
+        self.size += 1
+        return node
+
+    def _free_node(self, node):
+        self.left[node] = self._free
+        self.right[node] = NIL
+        self.parent[node] = NIL
+        self._free = node
+        self.size -= 1
+
+    def _rotate_left(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        y = right[x]
+        right[x] = left[y]
+        if left[y] != NIL:
+            parent[left[y]] = x
+        p = parent[x]
+        parent[y] = p
+        if p == NIL:
+            self.root = y
+        elif left[p] == x:
+            left[p] = y
+        else:
+            right[p] = y
+        left[y] = x
+        parent[x] = y
+        return y
+
+    def _rotate_right(self, y):
+        left, right, parent = self.left, self.right, self.parent
+        x = left[y]
+        left[y] = right[x]
+        if right[x] != NIL:
+            parent[right[x]] = y
+        p = parent[y]
+        parent[x] = p
+        if p == NIL:
+            self.root = x
+        elif right[p] == y:
+            right[p] = x
+        else:
+            left[p] = x
+        right[x] = y
+        parent[y] = x
+        return x
+
+    def _after_insert(self, node):
+        pass
+
+    def _after_delete(self, node, child, parent, is_left):
+        pass
+
+    def insert(self, key):
+        """Вставка ключа, возвращает индекс узла с этим ключом"""
+        keys, left, right = self.keys, self.left, self.right
+        node = self.root
+        if node == NIL:
+            self.root = self._new_node(key, NIL)
+            self._after_insert(self.root)
+            return self.root
+        while True:
+            node_key = keys[node]
+            if key < node_key:
+                if left[node] == NIL:
+                    new = self._new_node(key, node)
+                    left[node] = new
+                    break
+                node = left[node]
+            elif key > node_key:
+                if right[node] == NIL:
+                    new = self._new_node(key, node)
+                    right[node] = new
+                    break
+                node = right[node]
+            else:
+                return node
+        self._after_insert(new)
+        return new
+
+    def search(self, key):
+        """Поиск ключа, возвращает индекс узла или NIL"""
+        keys, left, right = self.keys, self.left, self.right
+        node = self.root
+        while node != NIL:
+            node_key = keys[node]
+            if key == node_key:
+                return node
+            node = left[node] if key < node_key else right[node]
+        return NIL
+
+    def delete(self, key):
+        """Удаление ключа, возвращает True, если ключ был в дереве"""
+        node = self.search(key)
+        if node == NIL:
+            return False
+        left, right, parent = self.left, self.right, self.parent
+
+        if left[node] != NIL and right[node] != NIL:
+            # Два ребенка: переносим ключ преемника и удаляем его узел
+            successor = right[node]
+            while left[successor] != NIL:
+                successor = left[successor]
+            self.keys[node] = self.keys[successor]
+            node = successor
+
+        child = left[node] if left[node] != NIL else right[node]
+        p = parent[node]
+        if child != NIL:
+            parent[child] = p
+        if p == NIL:
+            self.root = child
+            is_left = True
+        elif left[p] == node:
+            left[p] = child
+            is_left = True
+        else:
+            right[p] = child
+            is_left = False
+
+        self._after_delete(node, child, p, is_left)
+        self._free_node(node)
+        return True
+
+    def inorder(self):
+        keys, left, right = self.keys, self.left, self.right
+        result = []
+        stack = []
+        node = self.root
+        while stack or node != NIL:
+            while node != NIL:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            result.append(keys[node])
+            node = right[node]
+        return result
+
+    def preorder(self):
+        keys, left, right = self.keys, self.left, self.right
+        result = []
+        stack = [self.root] if self.root != NIL else []
+        while stack:
+            node = stack.pop()
+            result.append(keys[node])
+            if right[node] != NIL:
+                stack.append(right[node])
+            if left[node] != NIL:
+                stack.append(left[node])
+        return result
+
+    def postorder(self):
+        keys, left, right = self.keys, self.left, self.right
+        result = []
+        stack = [self.root] if self.root != NIL else []
+        while stack:
+            node = stack.pop()
+            result.append(keys[node])
+            if left[node] != NIL:
+                stack.append(left[node])
+            if right[node] != NIL:
+                stack.append(right[node])
+        result.reverse()
+        return result
+
+    def bfs(self):
+        keys, left, right = self.keys, self.left, self.right
+        result = []
+        if self.root == NIL:
+            return result
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            result.append(keys[node])
+            if left[node] != NIL:
+                queue.append(left[node])
+            if right[node] != NIL:
+                queue.append(right[node])
+        return result
+
+    def height(self):
+        """Высота в ребрах, как у Node.height: пустое дерево -1"""
+        left, right = self.left, self.right
+        height = -1
+        level = [self.root] if self.root != NIL else []
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if left[node] != NIL:
+                    next_level.append(left[node])
+                if right[node] != NIL:
+                    next_level.append(right[node])
+            level = next_level
+        return height
+
+
+class HeightArray:
+    """Высоты узлов в массиве heights (1 у листа), высота дерева - из корня за O(1).
+    Примешивается перед ArrayBST или его наследником."""
+
+    def __init__(self, key_typecode="q"):
+        super().__init__(key_typecode)
+        self.heights = array("i")
+
+    def _extend(self):
+        super()._extend()
+        self.heights.append(1)
+
+    def _new_node(self, key, parent):
+        node = super()._new_node(key, parent)
+        self.heights[node] = 1
+        return node
+
+    def _h(self, node):
+        return 0 if node == NIL else self.heights[node]
+
+    def _update_height(self, node):
+        self.heights[node] = max(self._h(self.left[node]), self._h(self.right[node])) + 1
+
+    def height(self):
+        # Высота корня хранится в узлах, поэтому O(1)
+        return self._h(self.root) - 1
+
+
+class ArrayAVL(HeightArray, ArrayBST):
+    """AVL дерево на массивах, высоты узлов хранятся в массиве heights"""
+
+    def _balance(self, node):
+        return self._h(self.left[node]) - self._h(self.right[node])
+
+    def _rotate_left(self, x):
+        y = super()._rotate_left(x)
+        self._update_height(x)
+        self._update_height(y)
+        return y
+
+    def _rotate_right(self, y):
+        x = super()._rotate_right(y)
+        self._update_height(y)
+        self._update_height(x)
+        return x
+
+    def _retrace(self, node):
+        """Обновление высот и балансировка на пути от node до корня"""
+        while node != NIL:
+            parent = self.parent[node]
+            self._update_height(node)
+            balance = self._balance(node)
+            if balance > 1:
+                if self._balance(self.left[node]) < 0:  # Left-Right case
+                    self._rotate_left(self.left[node])
+                self._rotate_right(node)  # Left-Left case
+            elif balance < -1:
+                if self._balance(self.right[node]) > 0:  # Right-Left case
+                    self._rotate_right(self.right[node])
+                self._rotate_left(node)  # Right-Right case
+            node = parent
+
+    def _after_insert(self, node):
+        self._retrace(self.parent[node])
+
+    def _after_delete(self, node, child, parent, is_left):
+        self._retrace(parent)
+
+
+class ArrayRB(ArrayBST):
+    """Красно-черное дерево на массивах, цвет - один байт на узел"""
+
+    RED = 1
+    BLACK = 0
+
+    def __init__(self, key_typecode="q"):
+        super().__init__(key_typecode)
+        self.colors = array("b")
+
+    def _extend(self):
+        self.colors.append(ArrayRB.RED)
+
+    def _new_node(self, key, parent):
+        node = super()._new_node(key, parent)
+        self.colors[node] = ArrayRB.RED
+        return node
+
+    def _color(self, node):
+        # NIL узлы считаются черными
+        return ArrayRB.BLACK if node == NIL else self.colors[node]
+
+    def _after_insert(self, node):
+        """Исправление свойств красно-черного дерева после вставки"""
+        colors, left, right, parent = self.colors, self.left, self.right, self.parent
+        RED, BLACK = ArrayRB.RED, ArrayRB.BLACK
+
+        while parent[node] != NIL and colors[parent[node]] == RED:
+            p = parent[node]
+            g = parent[p]
+            if p == left[g]:
+                uncle = right[g]
+                if uncle != NIL and colors[uncle] == RED:
+                    # Случай 1: дядя красный
+                    colors[p] = BLACK
+                    colors[uncle] = BLACK
+                    colors[g] = RED
+                    node = g
+                    continue
+                if node == right[p]:
+                    # Случай 2: узел - правый потомок
+                    node = p
+                    self._rotate_left(node)
+                    p = parent[node]
+                # Случай 3: узел - левый потомок
+                colors[p] = BLACK
+                colors[g] = RED
+                self._rotate_right(g)
+            else:
+                uncle = left[g]
+                if uncle != NIL and colors[uncle] == RED:
+                    colors[p] = BLACK
+                    colors[uncle] = BLACK
+                    colors[g] = RED
+                    node = g
+                    continue
+                if node == left[p]:
+                    node = p
+                    self._rotate_right(node)
+                    p = parent[node]
+                colors[p] = BLACK
+                colors[g] = RED
+                self._rotate_left(g)
+
+        # Корень всегда черный
+        colors[self.root] = BLACK
+
+    def _after_delete(self, node, child, parent, is_left):
+        """Устранение "двойной черноты" после удаления черного узла"""
+        colors, left, right = self.colors, self.left, self.right
+        RED, BLACK = ArrayRB.RED, ArrayRB.BLACK
+        if colors[node] == RED:
+            return
+
+        x = child
+        while x != self.root and self._color(x) == BLACK:
+            if is_left:
+                w = right[parent]
+                if colors[w] == RED:
+                    colors[w] = BLACK
+                    colors[parent] = RED
+                    self._rotate_left(parent)
+                    w = right[parent]
+                if self._color(left[w]) == BLACK and self._color(right[w]) == BLACK:
+                    colors[w] = RED
+                    x = parent
+                    parent = self.parent[x]
+                    is_left = parent != NIL and left[parent] == x
+                else:
+                    if self._color(right[w]) == BLACK:
+                        colors[left[w]] = BLACK
+                        colors[w] = RED
+                        self._rotate_right(w)
+                        w = right[parent]
+                    colors[w] = colors[parent]
+                    colors[parent] = BLACK
+                    colors[right[w]] = BLACK
+                    self._rotate_left(parent)
+                    x = self.root
+            else:
+                w = left[parent]
+                if colors[w] == RED:
+                    colors[w] = BLACK
+                    colors[parent] = RED
+                    self._rotate_right(parent)
+                    w = left[parent]
+                if self._color(left[w]) == BLACK and self._color(right[w]) == BLACK:
+                    colors[w] = RED
+                    x = parent
+                    parent = self.parent[x]
+                    is_left = parent != NIL and left[parent] == x
+                else:
+                    if self._color(left[w]) == BLACK:
+                        colors[right[w]] = BLACK
+                        colors[w] = RED
+                        self._rotate_left(w)
+                        w = left[parent]
+                    colors[w] = colors[parent]
+                    colors[parent] = BLACK
+                    colors[left[w]] = BLACK
+                    self._rotate_right(parent)
+                    x = self.root
+
+        if x != NIL:
+            colors[x] = BLACK
+
+
+class ArrayRBHeight(HeightArray, ArrayRB):
+    """Красно-черное дерево на массивах, которое хранит высоты поддеревьев,
+    как RB_HeightNode: высота дерева читается из корня за O(1)"""
+
+    def _update_heights_upward(self, node):
+        """Пересчет высот от node к корню, пока они меняются"""
+        heights, left, right, parent = self.heights, self.left, self.right, self.parent
+        while node != NIL:
+            # Высота NIL - 0, а heights[-1] - высота последнего слота, поэтому проверки
+            left_height = heights[left[node]] if left[node] != NIL else 0
+            right_height = heights[right[node]] if right[node] != NIL else 0
+            height = (left_height if left_height > right_height else right_height) + 1
+            if heights[node] == height:
+                break
+            heights[node] = height
+            node = parent[node]
+
+    def _after_rotate(self, child, new_top):
+        self._update_height(child)
+        self._update_height(new_top)
+        self._update_heights_upward(self.parent[new_top])
+
+    def _rotate_left(self, x):
+        y = super()._rotate_left(x)
+        self._after_rotate(x, y)
+        return y
+
+    def _rotate_right(self, y):
+        x = super()._rotate_right(y)
+        self._after_rotate(y, x)
+        return x
+
+    def _after_insert(self, node):
+        # Новый лист удлиняет путь до корня, повороты ниже поправят свои узлы
+        self._update_heights_upward(self.parent[node])
+        super()._after_insert(node)
+
+    def _after_delete(self, node, child, parent, is_left):
+        self._update_heights_upward(parent)
+        super()._after_delete(node, child, parent, is_left)
@@ -1,11 +1,37 @@
-from bst import Node
+import os
+import tempfile
+import tree_check
+import tree_io
+from bst import JoinOperations, Node, OrderStatistics, SelfRooted, sorted_unique_keys
 
 
-class AVL_Node(Node):
+class AVL_Node(SelfRooted, JoinOperations, Node):
+    __slots__ = ("height",)
+    _FILE_KIND = tree_io.KIND_AVL
+    # Счетчики tree_stats.TreeStats, включаются через tree_stats.collect
+    _stats = None
+
     def __init__(self, key, parent=None):
         super().__init__(key, parent)
         self.height = 1
 
+    @classmethod
+    def from_sorted(cls, iterable):
+        """Построение сбалансированного AVL дерева за O(n), возвращает корень"""
+        keys = sorted_unique_keys(iterable)
+
+        def build(lo, hi, parent):
+            if lo > hi:
+                return None
+            mid = (lo + hi) // 2
+            node = cls(keys[mid], parent)
+            node.left = build(lo, mid - 1, node)
+            node.right = build(mid + 1, hi, node)
+            node.update_height()
+            return node
+
+        return build(0, len(keys) - 1, None)
+
     def update_height(self):
         left_height = self.left.height if self.left else 0
         right_height = self.right.height if self.right else 0
@@ -17,6 +43,8 @@ class AVL_Node(Node):
         return left_height - right_height
 
     def rotate_left(self):
+        if self._stats is not None:
+            self._stats.rotations += 1
         new_root = self.right
         self.right = new_root.left
         if new_root.left:
@@ -31,6 +59,8 @@ class AVL_Node(Node):
         return new_root
 
     def rotate_right(self):
+        if self._stats is not None:
+            self._stats.rotations += 1
         new_root = self.left
         self.left = new_root.right
         if new_root.right:
@@ -47,6 +77,8 @@ class AVL_Node(Node):
     def rebalance(self):
         self.update_height()
         balance = self.get_balance()
+        if self._stats is not None and (balance > 1 or balance < -1):
+            self._stats.rebalances += 1
 
         # Left Heavy
         if balance > 1:
@@ -62,65 +94,191 @@ class AVL_Node(Node):
 
         return self
 
+    def _retrace_insert(self):
+        """Подъем от только что подвешенного листа self к корню.
+        Останавливается, как только высота поддерева не изменилась или
+        после первой балансировки: после вставки она восстанавливает высоту."""
+        node = self.parent
+        while node is not None:
+            old_height = node.height
+            node.update_height()
+            balance = node.get_balance()
+            if balance > 1 or balance < -1:
+                parent = node.parent
+                new_top = node.rebalance()
+                if parent is not None:
+                    if parent.left is node:
+                        parent.left = new_top
+                    else:
+                        parent.right = new_top
+                return
+            if node.height == old_height:
+                return
+            node = node.parent
+
+    def _retrace_delete(self):
+        """Подъем от self - родителя вырезанного узла - к корню.
+        В отличие от вставки, балансировка после удаления может уменьшить
+        высоту поддерева, поэтому подъем продолжается, пока высота меняется."""
+        node = self
+        while node is not None:
+            old_height = node.height
+            node.update_height()
+            balance = node.get_balance()
+            if balance > 1 or balance < -1:
+                parent = node.parent
+                new_top = node.rebalance()
+                if parent is not None:
+                    if parent.left is node:
+                        parent.left = new_top
+                    else:
+                        parent.right = new_top
+                node = new_top
+            if node.height == old_height:
+                return
+            node = node.parent
+
+    def _true_root(self):
+        # self был корнем до операции; поворот в корне делает его ребенком нового корня
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root
+
     def insert(self, key):
-        if key < self.key:
-            if self.left is None:
-                self.left = AVL_Node(key, self)
-            else:
-                self.left = self.left.insert(key)
-        elif key > self.key:
-            if self.right is None:
-                self.right = AVL_Node(key, self)
+        """Вставка ключа без рекурсии, возвращает корень дерева"""
+        node = self
+        while True:
+            if key < node.key:
+                if node.left is None:
+                    node.left = type(self)(key, node)
+                    leaf = node.left
+                    break
+                node = node.left
+            elif key > node.key:
+                if node.right is None:
+                    node.right = type(self)(key, node)
+                    leaf = node.right
+                    break
+                node = node.right
             else:
-                self.right = self.right.insert(key)
-        else:
-            return self
+                return self
 
-        return self.rebalance()
+        leaf._retrace_insert()
+        return self._true_root()
 
     def delete(self, key):
-        # Базовый случай поиска узла
-        if key < self.key:
-            if self.left:
-                self.left = self.left.delete(key)
-        elif key > self.key:
-            if self.right:
-                self.right = self.right.delete(key)
+        """Удаление ключа без рекурсии, возвращает корень дерева (None, если оно опустело)"""
+        node = self
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+        if node is None:
+            return self
+
+        # У узла с двумя детьми забираем ключ преемника и удаляем преемника
+        if node.left is not None and node.right is not None:
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            node.key = successor.key
+            node = successor
+
+        child = node.left if node.left is not None else node.right
+        parent = node.parent
+        if child is not None:
+            child.parent = parent
+        if parent is None:
+            return child
+        if parent.left is node:
+            parent.left = child
         else:
-            # Нашли узел для удаления
-            if self.left is None and self.right is None:
-                return None
-            elif self.left is None:
-                if self.right:
-                    self.right.parent = self.parent
-                return self.right
-            elif self.right is None:
-                if self.left:
-                    self.left.parent = self.parent
-                return self.left
-            else:
-                # Узел с двумя детьми
-                successor = self.right
-                while successor and successor.left:
-                    successor = successor.left
-                self.key = successor.key
-                self.right = self.right.delete(successor.key)
-
-        # Перебалансировка
-        if self is None:
-            return None
-        return self.rebalance()
+            parent.right = child
+        node.parent = None
+
+        parent._retrace_delete()
+        return self._true_root()
 
-    # Исправленный метод search
     def search(self, key):
-        # Переопределяем поиск для AVL дерева
-        if key == self.key:
-            return self
-        elif key < self.key and self.left:
-            return self.left.search(key)
-        elif key > self.key and self.right:
-            return self.right.search(key)
-        return None
+        node = self
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+        return node
+
+    # Ранг AVL дерева для JoinOperations - его высота, она хранится в узлах
+    @staticmethod
+    def _rank(root):
+        return root.height if root else 0
+
+    @staticmethod
+    def _child_rank(node, rank, child):
+        return child.height if child else 0
+
+    @classmethod
+    def _make(cls, left, key, right):
+        node = cls(key)
+        node.left = left
+        node.right = right
+        if left:
+            left.parent = node
+        if right:
+            right.parent = node
+        node.update_height()
+        return node
+
+    @classmethod
+    def _join(cls, left, left_rank, key, right, right_rank):
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        if left_height > right_height + 1:
+            root = cls._join_right(left, key, right)
+        elif right_height > left_height + 1:
+            root = cls._join_left(left, key, right)
+        else:
+            root = cls._make(left, key, right)
+        root.parent = None
+        return root, root.height
+
+    @classmethod
+    def _join_right(cls, left, key, right):
+        """Спуск по правому краю более высокого left до поддерева высоты right"""
+        right_height = right.height if right else 0
+        child = left.right
+        if (child.height if child else 0) <= right_height + 1:
+            subtree = cls._make(child, key, right)
+            double_rotation = True
+        else:
+            subtree = cls._join_right(child, key, right)
+            double_rotation = False
+
+        left.right = subtree
+        subtree.parent = left
+        if subtree.height <= (left.left.height if left.left else 0) + 1:
+            left.update_height()
+            return left
+        if double_rotation:
+            left.right = subtree.rotate_right()
+        return left.rotate_left()
+
+    @classmethod
+    def _join_left(cls, left, key, right):
+        """Симметрично _join_right: спуск по левому краю более высокого right"""
+        left_height = left.height if left else 0
+        child = right.left
+        if (child.height if child else 0) <= left_height + 1:
+            subtree = cls._make(left, key, child)
+            double_rotation = True
+        else:
+            subtree = cls._join_left(left, key, child)
+            double_rotation = False
+
+        right.left = subtree
+        subtree.parent = right
+        if subtree.height <= (right.right.height if right.right else 0) + 1:
+            right.update_height()
+            return right
+        if double_rotation:
+            right.left = subtree.rotate_left()
+        return right.rotate_right()
 
     def print_tree_visual(self, level=0, prefix="Root: "):
         """Визуализация дерева (корень сверху) с балансом"""
@@ -143,6 +301,40 @@ class AVL_Node(Node):
             self.left.print_tree_visual(level + 1, "└── ")
 
 
+class AVL_SizeNode(OrderStatistics, AVL_Node):
+    """AVL дерево с размерами поддеревьев: select, rank и count_range за O(log n)"""
+    __slots__ = ("size",)
+    # Размеры поддеревьев в файл не пишутся
+    _FILE_KIND = None
+
+    def __init__(self, key, parent=None):
+        super().__init__(key, parent)
+        self.size = 1
+
+    def update_height(self):
+        # Вставка, удаление и повороты пересчитывают высоту узла, размер - там же
+        super().update_height()
+        left_size = self.left.size if self.left else 0
+        right_size = self.right.size if self.right else 0
+        self.size = left_size + right_size + 1
+
+    # Подъем после вставки и удаления останавливается раньше корня,
+    # поэтому размеры всех предков сначала поправляются здесь
+    def _retrace_insert(self):
+        node = self.parent
+        while node is not None:
+            node.size += 1
+            node = node.parent
+        super()._retrace_insert()
+
+    def _retrace_delete(self):
+        node = self
+        while node is not None:
+            node.size -= 1
+            node = node.parent
+        super()._retrace_delete()
+
+
 def test_avl():
     print("\n" + "=" * 50)
     print("ТЕСТ AVL ДЕРЕВА")
@@ -156,9 +348,6 @@ def test_avl():
     for key in test_keys:
         print(f"   Вставляем {key}", end="")
         avl_root = avl_root.insert(key)
-        # Находим корень дерева
-        while avl_root.parent:
-            avl_root = avl_root.parent
         balance = avl_root.get_balance()
         print(f" - баланс корня: {balance}, высота: {avl_root.height}")
         if abs(balance) > 1:
@@ -167,31 +356,16 @@ def test_avl():
     print("\n2. Проверка свойств AVL дерева:")
 
     def check_avl_balance(node):
-        if node is None:
-            return True
-
-        balance = node.get_balance()
-        if abs(balance) > 1:
-            print(f"    Узел {node.key} несбалансирован (баланс: {balance})")
-            return False
-
-        left_ok = check_avl_balance(node.left)
-        right_ok = check_avl_balance(node.right)
-        return left_ok and right_ok
+        violations = tree_check.validate(node)
+        for violation in violations:
+            print(f"    {violation}")
+        return not violations
 
     if check_avl_balance(avl_root):
         print("    Все узлы сбалансированы (|баланс| ≤ 1)")
 
     print("\n3. Проверка сортировки:")
-    sorted_keys = []
-
-    def inorder_collect(node):
-        if node:
-            inorder_collect(node.left)
-            sorted_keys.append(node.key)
-            inorder_collect(node.right)
-
-    inorder_collect(avl_root)
+    sorted_keys = list(avl_root.iter_inorder(avl_root))
     print(f"   Inorder: {sorted_keys}")
 
     if sorted_keys == sorted(sorted_keys):
@@ -205,10 +379,6 @@ def test_avl():
         print(f"   Удаляем {key}")
         if avl_root:
             avl_root = avl_root.delete(key)
-            if avl_root:
-                # Находим корень после удаления
-                while avl_root.parent:
-                    avl_root = avl_root.parent
 
     if avl_root:
         print(f"   Новый корень: {avl_root.key}")
@@ -232,6 +402,47 @@ def test_avl():
     else:
         print("   Дерево пустое")
 
+    print("\n7. Построение из отсортированных ключей:")
+    bulk_root = AVL_Node.from_sorted(range(1, 101))
+    print(f"   Корень: {bulk_root.key}, высота: {bulk_root.height}")
+    if check_avl_balance(bulk_root) and bulk_root.inorder(bulk_root) == list(range(1, 101)):
+        print("    Дерево сбалансировано и отсортировано")
+
+    print("\n8. Порядковые статистики:")
+    stat_root = AVL_SizeNode(50)
+    for key in test_keys:
+        stat_root = stat_root.insert(key)
+    stat_root = stat_root.delete(40)
+    stat_keys = stat_root.inorder(stat_root)
+    print(f"   Ключи: {stat_keys}")
+    print(f"   select(0) = {stat_root.select(0)}, select(4) = {stat_root.select(4)}, "
+          f"rank(60) = {stat_root.rank(60)}, count_range(20, 70) = {stat_root.count_range(20, 70)}")
+    if [stat_root.select(i) for i in range(stat_root.size)] == stat_keys:
+        print("    select согласован с inorder")
+
+    print("\n9. Разрезание и объединение:")
+    less, found, greater = AVL_Node.from_sorted(range(1, 21)).split(10)
+    print(f"   split(10): {less.inorder(less)} | найден: {found} | {greater.inorder(greater)}")
+    merged = AVL_Node.union(less, AVL_Node.from_sorted(range(15, 31, 5)))
+    merged = AVL_Node.join(merged, 100, AVL_Node.from_sorted([200, 300]))
+    print(f"   union + join: {merged.inorder(merged)}")
+    if check_avl_balance(merged):
+        print("    Результат сбалансирован")
+
+    print("\n10. Сохранение в файл:")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "avl.tree")
+        avl_root.dump(path)
+        loaded = AVL_Node.load(path)
+    print(f"   dump/load: {loaded.inorder(loaded)}")
+    # Высоты читаются из файла (1 байт на узел), а не пересчитываются
+    saved = [(node.key, node.height) for node in tree_io.preorder_nodes(avl_root)]
+    restored = [(node.key, node.height) for node in tree_io.preorder_nodes(loaded)]
+    if saved == restored and check_avl_balance(loaded):
+        print("    Форма и высоты узлов совпадают, дерево корректно")
+    else:
+        print("    Форма или высоты узлов изменились")
+
     return avl_root
 
 
@@ -1,6 +1,54 @@
+import os
+import tempfile
+from bisect import bisect_left
 from collections import deque
+import tree_io
+
+def sorted_unique_keys(iterable):
+    """Ключи по возрастанию без повторов; уже отсортированный вход - за O(n)"""
+    keys = list(iterable)
+    if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+        keys.sort()
+    # Дерево не хранит одинаковые ключи
+    return [key for i, key in enumerate(keys) if i == 0 or keys[i - 1] != key]
+
+
+def _search_sorted(root, keys):
+    """Узлы для отсортированных различных ключей keys (None, если ключа нет)"""
+    found = [None] * len(keys)
+    stack = [(root, 0, len(keys))] if root is not None and keys else []
+    while stack:
+        node, lo, hi = stack.pop()
+        # Отрезок запросов делится на части для левого и правого поддеревьев,
+        # одна уходит в стек, по другой спуск продолжается
+        while hi - lo > 1:
+            i = bisect_left(keys, node.key, lo, hi)
+            j = i
+            if i < hi and keys[i] == node.key:
+                found[i] = node
+                j = i + 1
+            left, right = node.left, node.right
+            if lo < i and left is not None:
+                if j < hi and right is not None:
+                    stack.append((right, j, hi))
+                node, hi = left, i
+            elif j < hi and right is not None:
+                node, lo = right, j
+            else:
+                break
+        else:
+            # Единственный запрос - обычный спуск
+            key = keys[lo]
+            while node is not None and key != node.key:
+                node = node.left if key < node.key else node.right
+            found[lo] = node
+    return found
+
 
 class Node:
+    # Без __dict__ у каждого узла: на миллионах узлов это в разы меньше памяти
+    __slots__ = ("key", "left", "right", "parent")
+    _FILE_KIND = tree_io.KIND_BST
 
     def __init__(self, key, parent=None):
         self.key = key
@@ -9,21 +57,59 @@ class Node:
         self.parent = parent
 
     def insert(self, root, key):
+        return self.insert_with_depth(root, key)[0]
+
+    def insert_with_depth(self, root, key):
+        """Вставка, возвращает (корень, глубина нового узла); глубина None, если ключ уже был"""
         if root is None:
-            return Node(key)
-        elif key < root.key:
-            root.left = self.insert(root.left, key)
-        elif key > root.key:
-            root.right = self.insert(root.right, key)
-        return root
+            return Node(key), 0
+        # Спускаемся циклом, без рекурсии: вырожденное дерево может иметь глубину n
+        node = root
+        depth = 1
+        while True:
+            if key < node.key:
+                if node.left is None:
+                    node.left = Node(key, node)
+                    return root, depth
+                node = node.left
+            elif key > node.key:
+                if node.right is None:
+                    node.right = Node(key, node)
+                    return root, depth
+                node = node.right
+            else:
+                return root, None
+            depth += 1
 
     def search(self, root, key):
-        if root is None or key == root.key:
-            return root
-        elif key < root.key:
-            return self.search(root.left, key)
-        else:
-            return self.search(root.right, key)
+        node = root
+        while node is not None and key != node.key:
+            if key < node.key:
+                node = node.left
+            else:
+                node = node.right
+        return node
+
+    def search_many(self, root, keys):
+        """Поиск пачки ключей за один согласованный спуск.
+
+        Запросы сортируются, и каждый узел делит свой отрезок запросов
+        бинарным поиском на ушедшие влево и вправо: общие начала путей
+        проходятся один раз на всю пачку. Возвращает список узлов (None для
+        отсутствующих ключей) в порядке запросов. Массив numpy сортируется
+        и очищается от повторов средствами numpy."""
+        if hasattr(keys, "dtype"):
+            import numpy as np
+            unique, inverse = np.unique(keys, return_inverse=True)
+            found = _search_sorted(root, unique.tolist())
+            # Раскладка по исходному порядку - индексированием массива, без цикла Python
+            nodes = np.empty(len(found), dtype=object)
+            nodes[:] = found
+            return nodes[inverse.ravel()].tolist()
+        keys = list(keys)
+        unique = sorted(set(keys))
+        found = dict(zip(unique, _search_sorted(root, unique)))
+        return [found[key] for key in keys]
 
     def findmin(self, root):
         if root is None:
@@ -42,69 +128,180 @@ class Node:
         return current
 
     def delete(self, root, key):
-        if root is None:
+        # Ищем удаляемый узел и его родителя
+        parent = None
+        node = root
+        while node is not None and key != node.key:
+            parent = node
+            if key < node.key:
+                node = node.left
+            else:
+                node = node.right
+
+        if node is None:
             return root
 
-        if key < root.key:
-            root.left = self.delete(root.left, key)
-        elif key > root.key:
-            root.right = self.delete(root.right, key)
+        if node.left is not None and node.right is not None:
+            # Узел с двумя детьми: берем ключ минимального из правого поддерева
+            # и дальше удаляем уже этот узел (у него нет левого ребенка)
+            parent = node
+            successor = node.right
+            while successor.left is not None:
+                parent = successor
+                successor = successor.left
+            node.key = successor.key
+            node = successor
+
+        # У узла не больше одного ребенка
+        child = node.left if node.left is not None else node.right
+        if child is not None:
+            child.parent = parent
+
+        if parent is None:
+            return child
+        if parent.left is node:
+            parent.left = child
         else:
-            if root.left is None and root.right is None:
-                # Узел без детей
-                return None
-            elif root.left is None:
-                # Узел с одним правым ребенком
-                if root.right:
-                    root.right.parent = root.parent
-                return root.right
-            elif root.right is None:
-                # Узел с одним левым ребенком
-                if root.left:
-                    root.left.parent = root.parent
-                return root.left
-            else:
-                # Узел с двумя детьми
-                min_node = self.findmin(root.right)
-                if min_node:
-                    root.key = min_node.key
-                    root.right = self.delete(root.right, min_node.key)
-                else:
-                    # Если правого поддерева нет, используем максимальный из левого
-                    max_node = self.findmax(root.left)
-                    if max_node:
-                        root.key = max_node.key
-                        root.left = self.delete(root.left, max_node.key)
-
+            parent.right = child
         return root
 
     def inorder(self, root, result=None):
         if result is None:
             result = []
-        if root is not None:
-            self.inorder(root.left, result)
-            result.append(root.key)
-            self.inorder(root.right, result)
+        stack = []
+        node = root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            result.append(node.key)
+            node = node.right
         return result
 
     def preorder(self, root, result=None):
         if result is None:
             result = []
-        if root is not None:
-            result.append(root.key)
-            self.preorder(root.left, result)
-            self.preorder(root.right, result)
+        if root is None:
+            return result
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            result.append(node.key)
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
         return result
 
     def postorder(self, root, result=None):
         if result is None:
             result = []
-        if root is not None:
-            self.postorder(root.left, result)
-            self.postorder(root.right, result)
-            result.append(root.key)
+        if root is None:
+            return result
+        # Обход "корень-правый-левый" в обратном порядке дает postorder
+        reversed_keys = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            reversed_keys.append(node.key)
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        reversed_keys.reverse()
+        result.extend(reversed_keys)
         return result
 
+    def iter_inorder(self, root):
+        """Ленивый inorder: ключи отдаются по одному, память O(высоты)"""
+        stack = []
+        node = root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key
+            node = node.right
+
+    def iter_preorder(self, root):
+        if root is None:
+            return
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            yield node.key
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+    def iter_postorder(self, root):
+        stack = []
+        last_visited = None
+        node = root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+                continue
+            top = stack[-1]
+            # Правое поддерево еще не пройдено - идем в него
+            if top.right is not None and top.right is not last_visited:
+                node = top.right
+            else:
+                stack.pop()
+                last_visited = top
+                yield top.key
+
+    def iter_bfs(self, root):
+        if root is None:
+            return
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            yield node.key
+            if node.left:
+                queue.append(node.left)
+            if node.right:
+                queue.append(node.right)
+
+    def iter_morris_inorder(self, root):
+        """Inorder обход Морриса с O(1) дополнительной памяти.
+        Во время обхода дерево временно прошивается через пустые правые ссылки,
+        поэтому менять его до окончания обхода нельзя."""
+        walk = self._morris_walk(root)
+        try:
+            for key in walk:
+                yield key
+        finally:
+            # При досрочном выходе доводим обход до конца, чтобы снять прошивку
+            for _ in walk:
+                pass
+
+    @staticmethod
+    def _morris_walk(root):
+        node = root
+        while node is not None:
+            if node.left is None:
+                key = node.key
+                node = node.right
+                yield key
+                continue
+            # Ищем inorder-предшественника узла
+            pred = node.left
+            while pred.right is not None and pred.right is not node:
+                pred = pred.right
+            if pred.right is None:
+                pred.right = node
+                node = node.left
+            else:
+                pred.right = None
+                key = node.key
+                node = node.right
+                yield key
+
     def bfs(self, root):
         result = []
         if root is None:
@@ -120,11 +317,30 @@ class Node:
         return result
 
     def height(self, root):
+        # Считаем уровни обходом в ширину, высота пустого дерева -1
         if root is None:
             return -1
-        left_height = self.height(root.left)
-        right_height = self.height(root.right)
-        return 1 + max(left_height, right_height)
+        height = -1
+        level = [root]
+        while level:
+            height += 1
+            next_level = []
+            for node in level:
+                if node.left is not None:
+                    next_level.append(node.left)
+                if node.right is not None:
+                    next_level.append(node.right)
+            level = next_level
+        return height
+
+    def dump(self, root, path):
+        """Сохранение дерева в компактный двоичный файл (формат - в tree_io.py)"""
+        tree_io.dump_tree(root, path, type(self))
+
+    @classmethod
+    def load(cls, path):
+        """Дерево той же формы из файла dump, за O(n) через mmap; возвращает корень"""
+        return tree_io.load_tree(cls, path)
 
     def print_tree_visual(self, root, level=0, prefix="Root: "):
         if root is None:
@@ -139,6 +355,404 @@ class Node:
             self.print_tree_visual(root.left, level + 1, "└── ")
 
 
+class OrderStatistics:
+    """Порядковые статистики за O(log n) для узлов, хранящих размер поддерева в size.
+    Методы вызываются у корня дерева."""
+    __slots__ = ()
+
+    def select(self, k):
+        """k-й по возрастанию ключ (нумерация с 0, как в списке inorder)"""
+        if not 0 <= k < self.size:
+            raise IndexError("Номер ключа вне дерева")
+        node = self
+        while True:
+            left_size = node.left.size if node.left else 0
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+
+    def rank(self, key):
+        """Количество ключей меньше key"""
+        return self._count_below(key, False)
+
+    def count_range(self, lo, hi):
+        """Количество ключей в отрезке [lo, hi]"""
+        if hi < lo:
+            return 0
+        return self._count_below(hi, True) - self._count_below(lo, False)
+
+    def _count_below(self, key, inclusive):
+        count = 0
+        node = self
+        while node is not None:
+            if key < node.key or (key == node.key and not inclusive):
+                node = node.left
+            else:
+                count += (node.left.size if node.left else 0) + 1
+                node = node.right
+        return count
+
+
+class RotateUp:
+    """Поворот вокруг родителя и подъем к корню по ссылкам parent для деревьев,
+    где методы вызываются у любого узла (splay, WAVL). Счетчик поворотов
+    берется из _stats класса узла."""
+    __slots__ = ()
+
+    def get_root(self):
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def _rotate_up(self):
+        """Поворот, поднимающий self над его родителем"""
+        if self._stats is not None:
+            self._stats.rotations += 1
+        parent = self.parent
+        grandparent = parent.parent
+        if parent.left is self:
+            parent.left = self.right
+            if self.right is not None:
+                self.right.parent = parent
+            self.right = parent
+        else:
+            parent.right = self.left
+            if self.left is not None:
+                self.left.parent = parent
+            self.left = parent
+        parent.parent = self
+        self.parent = grandparent
+        if grandparent is not None:
+            if grandparent.left is parent:
+                grandparent.left = self
+            else:
+                grandparent.right = self
+
+
+class SelfRooted:
+    """Методы Node для деревьев, операции которых вызываются у корня (AVL, RB):
+    корень - сам self, а не отдельный аргумент."""
+    __slots__ = ()
+
+    def search_many(self, keys):
+        """Поиск пачки ключей одним спуском, см. Node.search_many"""
+        return Node.search_many(self, self, keys)
+
+    def freeze(self):
+        """Неизменяемый снимок дерева для пакетного поиска, см. frozen.FrozenTree"""
+        from frozen import FrozenTree
+        return FrozenTree(list(self.iter_inorder(self)))
+
+    def dump(self, path):
+        """Сохранение дерева с корнем self в файл, см. Node.dump"""
+        Node.dump(self, self, path)
+
+
+class JoinOperations:
+    """split, join и операции над множествами поверх join (Blelloch, Ferizovic, Sun).
+
+    Наследник задает ранг дерева (высоту у AVL, черную высоту у RB) через
+    _rank и _child_rank и сливает два дерева с ключом-разделителем в _join.
+    Ранг передается вместе с поддеревом, поэтому его не нужно пересчитывать.
+    Операции разрушающие: узлы исходных деревьев переиспользуются."""
+    __slots__ = ()
+
+    @classmethod
+    def join(cls, left, key, right):
+        """Дерево из ключей left, key и right; все ключи left < key < все ключи right"""
+        root, _ = cls._join(left, cls._rank(left), key, right, cls._rank(right))
+        return cls._finish(root)
+
+    def split(self, key):
+        """Разрезать дерево по key: (ключи < key, есть ли key, ключи > key)"""
+        left, _, found, right, _ = self._split(self, self._rank(self), key)
+        return self._finish(left), found, self._finish(right)
+
+    @classmethod
+    def union(cls, a, b):
+        root, _ = cls._union(a, cls._rank(a), b, cls._rank(b))
+        return cls._finish(root)
+
+    @classmethod
+    def intersection(cls, a, b):
+        root, _ = cls._intersection(a, cls._rank(a), b, cls._rank(b))
+        return cls._finish(root)
+
+    @classmethod
+    def difference(cls, a, b):
+        """Ключи a, которых нет в b"""
+        root, _ = cls._difference(a, cls._rank(a), b, cls._rank(b))
+        return cls._finish(root)
+
+    @classmethod
+    def _finish(cls, root):
+        if root is not None:
+            root.parent = None
+        return root
+
+    @staticmethod
+    def _detach(node):
+        """Отцепить детей от узла, они становятся самостоятельными деревьями"""
+        left, right = node.left, node.right
+        if left is not None:
+            left.parent = None
+        if right is not None:
+            right.parent = None
+        node.left = None
+        node.right = None
+        return left, right
+
+    @classmethod
+    def _split(cls, node, rank, key):
+        if node is None:
+            return None, 0, False, None, 0
+        left_rank = cls._child_rank(node, rank, node.left)
+        right_rank = cls._child_rank(node, rank, node.right)
+        left, right = cls._detach(node)
+
+        if key == node.key:
+            return left, left_rank, True, right, right_rank
+        if key < node.key:
+            less, less_rank, found, greater, greater_rank = cls._split(left, left_rank, key)
+            greater, greater_rank = cls._join(greater, greater_rank, node.key, right, right_rank)
+            return less, less_rank, found, greater, greater_rank
+        less, less_rank, found, greater, greater_rank = cls._split(right, right_rank, key)
+        less, less_rank = cls._join(left, left_rank, node.key, less, less_rank)
+        return less, less_rank, found, greater, greater_rank
+
+    @classmethod
+    def _split_last(cls, node, rank):
+        """Отделить максимальный ключ: (дерево без него, ранг, ключ)"""
+        left_rank = cls._child_rank(node, rank, node.left)
+        right_rank = cls._child_rank(node, rank, node.right)
+        left, right = cls._detach(node)
+        if right is None:
+            return left, left_rank, node.key
+        rest, rest_rank, last_key = cls._split_last(right, right_rank)
+        root, root_rank = cls._join(left, left_rank, node.key, rest, rest_rank)
+        return root, root_rank, last_key
+
+    @classmethod
+    def _join2(cls, left, left_rank, right, right_rank):
+        """join без ключа-разделителя"""
+        if left is None:
+            return right, right_rank
+        rest, rest_rank, last_key = cls._split_last(left, left_rank)
+        return cls._join(rest, rest_rank, last_key, right, right_rank)
+
+    @classmethod
+    def _union(cls, a, a_rank, b, b_rank):
+        if a is None:
+            return b, b_rank
+        if b is None:
+            return a, a_rank
+        key = b.key
+        b_left_rank = cls._child_rank(b, b_rank, b.left)
+        b_right_rank = cls._child_rank(b, b_rank, b.right)
+        b_left, b_right = cls._detach(b)
+        less, less_rank, _, greater, greater_rank = cls._split(a, a_rank, key)
+        left, left_rank = cls._union(less, less_rank, b_left, b_left_rank)
+        right, right_rank = cls._union(greater, greater_rank, b_right, b_right_rank)
+        return cls._join(left, left_rank, key, right, right_rank)
+
+    @classmethod
+    def _intersection(cls, a, a_rank, b, b_rank):
+        if a is None or b is None:
+            return None, 0
+        key = b.key
+        b_left_rank = cls._child_rank(b, b_rank, b.left)
+        b_right_rank = cls._child_rank(b, b_rank, b.right)
+        b_left, b_right = cls._detach(b)
+        less, less_rank, found, greater, greater_rank = cls._split(a, a_rank, key)
+        left, left_rank = cls._intersection(less, less_rank, b_left, b_left_rank)
+        right, right_rank = cls._intersection(greater, greater_rank, b_right, b_right_rank)
+        if found:
+            return cls._join(left, left_rank, key, right, right_rank)
+        return cls._join2(left, left_rank, right, right_rank)
+
+    @classmethod
+    def _difference(cls, a, a_rank, b, b_rank):
+        if a is None:
+            return None, 0
+        if b is None:
+            return a, a_rank
+        key = b.key
+        b_left_rank = cls._child_rank(b, b_rank, b.left)
+        b_right_rank = cls._child_rank(b, b_rank, b.right)
+        b_left, b_right = cls._detach(b)
+        less, less_rank, _, greater, greater_rank = cls._split(a, a_rank, key)
+        left, left_rank = cls._difference(less, less_rank, b_left, b_left_rank)
+        right, right_rank = cls._difference(greater, greater_rank, b_right, b_right_rank)
+        return cls._join2(left, left_rank, right, right_rank)
+
+
+class TrackedBST:
+    """BST из узлов Node, которое знает свою высоту и сумму глубин узлов.
+
+    Вставка сообщает глубину нового узла, поэтому число узлов на каждой
+    глубине и сумма глубин обновляются за O(1), и height() не обходит дерево.
+    Удаление листа тоже обновляет их за O(1). Когда вырезается узел с одним
+    ребенком, его поддерево поднимается на уровень, и счетчики сдвигаются
+    обходом только этого поддерева. Если поддерево доходит до нижнего уровня
+    дерева, счетчики помечаются устаревшими и пересчитываются одним обходом
+    всего дерева, но лениво - при следующем запросе."""
+
+    def __init__(self, keys=()):
+        self.root = None
+        self.size = 0
+        self._depth_sum = 0
+        # _level_counts[d] - число узлов на глубине d; последний элемент не нулевой
+        self._level_counts = []
+        self._stale = False
+        for key in keys:
+            self.insert(key)
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, key):
+        """Вставка ключа, возвращает глубину нового узла (None, если ключ уже был)"""
+        if self.root is None:
+            self.root, depth = Node(key), 0
+        else:
+            _, depth = self.root.insert_with_depth(self.root, key)
+            if depth is None:
+                return None
+        self.size += 1
+        if not self._stale:
+            self._depth_sum += depth
+            counts = self._level_counts
+            if depth < len(counts):
+                counts[depth] += 1
+            else:
+                counts.append(1)
+        return depth
+
+    def search(self, key):
+        return Node.search(self.root, self.root, key)
+
+    def delete(self, key):
+        """Удаление ключа, возвращает True, если ключ был в дереве"""
+        # Ищем узел, который будет физически вырезан, и его глубину
+        node = self.root
+        depth = 0
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+            depth += 1
+        if node is None:
+            return False
+        if node.left is not None and node.right is not None:
+            node = node.right
+            depth += 1
+            while node.left is not None:
+                node = node.left
+                depth += 1
+        child = node.left if node.left is not None else node.right
+
+        self.root = Node.delete(self.root, self.root, key)
+        self.size -= 1
+        if not self._stale:
+            self._depth_sum -= depth
+            self._level_counts[depth] -= 1
+            if child is not None:
+                self._lift(child, depth + 1)
+            while self._level_counts and self._level_counts[-1] == 0:
+                self._level_counts.pop()
+        return True
+
+    def _lift(self, child, child_depth):
+        """Сдвиг счетчиков поддерева child, поднятого с глубины child_depth на уровень вверх"""
+        counts = self._level_counts
+        bottom = len(counts) - 1
+        sizes = []
+        level = [child]
+        while level:
+            if child_depth + len(sizes) == bottom:
+                # Поддерево доходит до нижнего уровня: после сдвига он может
+                # опустеть, проще пересчитать все при следующем запросе
+                self._stale = True
+                return
+            sizes.append(len(level))
+            level = [node for parent in level for node in (parent.left, parent.right) if node is not None]
+        for offset, size in enumerate(sizes):
+            counts[child_depth + offset] -= size
+            counts[child_depth + offset - 1] += size
+            self._depth_sum -= size
+
+    def _recount(self):
+        """Пересчет счетчиков обходом по уровням"""
+        self._level_counts = []
+        self._depth_sum = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            self._depth_sum += len(self._level_counts) * len(level)
+            self._level_counts.append(len(level))
+            level = [child for node in level for child in (node.left, node.right) if child is not None]
+        self._stale = False
+
+    def height(self):
+        """Высота в ребрах, пустое дерево -1"""
+        if self._stale:
+            self._recount()
+        return len(self._level_counts) - 1
+
+    def average_depth(self):
+        if self._stale:
+            self._recount()
+        return self._depth_sum / self.size if self.size else 0.0
+
+    def inorder(self):
+        return Node.inorder(self.root, self.root)
+
+
+def build_tree(node_class, keys):
+    """Дерево из узлов node_class вставкой keys по порядку, возвращает корень.
+
+    У Node корень передается в insert явно, остальные узлы (AVL, RB, WAVL,
+    splay) вставляют от себя и возвращают новый корень. Корень красно-черного
+    дерева создается черным."""
+    if not keys:
+        return None
+    if hasattr(node_class, "BLACK"):
+        root = node_class(keys[0], color=node_class.BLACK)
+    else:
+        root = node_class(keys[0])
+    if node_class.insert is Node.insert:
+        for key in keys[1:]:
+            root.insert(root, key)
+        return root
+    for key in keys[1:]:
+        root = root.insert(key)
+    return root
+
+
+def build_bst(keys):
+    return build_tree(Node, keys)
+
+
+def check_tracked(bst, root, tracked):
+    """Сравнение высоты и средней глубины TrackedBST с обходом дерева root по уровням"""
+    depth_sum = size = depth = 0
+    level = [root] if root is not None else []
+    while level:
+        depth_sum += depth * len(level)
+        size += len(level)
+        level = [child for node in level for child in (node.left, node.right) if child is not None]
+        depth += 1
+    average = depth_sum / size if size else 0.0
+    same_keys = bst.inorder(tracked.root) == bst.inorder(root)
+    if same_keys and tracked.height() == bst.height(root) and tracked.average_depth() == average:
+        print(f"    TrackedBST: высота {tracked.height()} и средняя глубина {average:.2f} совпадают с обходом")
+    else:
+        print(f"    TrackedBST расходится с обходом: высота {tracked.height()} вместо {bst.height(root)}, "
+              f"средняя глубина {tracked.average_depth():.2f} вместо {average:.2f}")
+
+
 def test_bst():
     print("=" * 50)
     print("ТЕСТ ОБЫЧНОГО BST ДЕРЕВА")
@@ -146,6 +760,8 @@ def test_bst():
 
     bst = Node(0)
     root = None
+    # Высоту и глубины считает само дерево при вставке, без обхода
+    tracked = TrackedBST()
     test_keys = [50, 30, 70, 20, 40, 60, 80, 10, 90]
     print("1. Вставляем элементы:", test_keys)
 
@@ -153,7 +769,10 @@ def test_bst():
         root = bst.insert(root, key)
         print(f"   Вставил {key}", end="")
         height = bst.height(root)
-        print(f" - высота дерева: {height}")
+        print(f" - высота дерева: {height}", end="")
+        depth = tracked.insert(key)
+        print(f", в TrackedBST на глубину {depth}, высота {tracked.height()}")
+    check_tracked(bst, root, tracked)
 
     print("\n2. Проверка обходов:")
 
@@ -168,6 +787,12 @@ def test_bst():
     bfs_result = bst.bfs(root)
     print("   BFS (по уровням):", bfs_result)
 
+    if list(bst.iter_inorder(root)) == inorder_result and \
+            list(bst.iter_morris_inorder(root)) == inorder_result:
+        print("    Ленивый обход и обход Морриса совпадают с inorder")
+    else:
+        print("    Ленивый обход или обход Морриса расходится с inorder")
+
     print("\n3. Тест поиска:")
     search_tests = [
         (30, "существующий в левом поддереве"),
@@ -182,6 +807,10 @@ def test_bst():
         else:
             print(f"   Ключ {key} ({description}) не найден")
 
+    batch = [90, 55, 30, 90]
+    found = [node.key if node else None for node in bst.search_many(root, batch)]
+    print(f"   Пакетный поиск {batch}: {found}")
+
     print(f"\n4. Высота дерева: {bst.height(root)}")
 
     print("\n5. Визуализация дерева:")
@@ -191,18 +820,24 @@ def test_bst():
 
     print("   Удаляем лист 10:")
     root = bst.delete(root, 10)
+    tracked.delete(10)
     print(f"   Inorder после удаления: {bst.inorder(root)}")
     print(f"   Высота после удаления 10: {bst.height(root)}")
+    check_tracked(bst, root, tracked)
 
     print("\n   Удаляем узел с одним ребенком 20:")
     root = bst.delete(root, 20)
+    tracked.delete(20)
     print(f"   Inorder после удаления: {bst.inorder(root)}")
     print(f"   Высота после удаления 20: {bst.height(root)}")
+    check_tracked(bst, root, tracked)
 
     print("\n   Удаляем узел с двумя детьми 50 (корень):")
     root = bst.delete(root, 50)
+    tracked.delete(50)
     print(f"   Inorder после удаления: {bst.inorder(root)}")
     print(f"   Высота после удаления 50: {bst.height(root)}")
+    check_tracked(bst, root, tracked)
 
     print("\n7. Проверка поиска после удаления:")
     for key in [50, 30, 60, 10]:
@@ -215,6 +850,28 @@ def test_bst():
     print("\n8. Финальное дерево:")
     bst.print_tree_visual(root)
 
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bst.tree")
+        bst.dump(root, path)
+        loaded = Node.load(path)
+        if bst.preorder(loaded) == bst.preorder(root):
+            print("    После dump/load дерево той же формы")
+        else:
+            print("    После dump/load форма дерева изменилась")
+        # Поиск прямо по файлу, без построения узлов
+        with tree_io.MappedTree(path) as mapped:
+            hits = bst.inorder(root)
+            misses = [key + 1 for key in hits] + [hits[0] - 1]
+            if all(key in mapped for key in hits) and not any(key in mapped for key in misses):
+                print(f"    MappedTree находит все {len(hits)} ключей и не находит {len(misses)} отсутствующих")
+            else:
+                print("    MappedTree ошибается в поиске")
+        try:
+            bst.dump(build_bst([1, 2 ** 63]), path)
+            print("    Ключ вне int64 сохранен без ошибки")
+        except ValueError:
+            print("    Ключ вне int64 отклонен с ValueError")
+
     return root
 
 
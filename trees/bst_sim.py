@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def depth_profile(keys):
+    """Число узлов на каждой глубине BST, построенного вставкой keys по порядку.
+    Узлы не создаются: дерево раскрывается по уровням векторными операциями NumPy.
+
+    На каждом уровне оставшиеся ключи разбиты на отрезки (поддеревья). Первый
+    вставленный ключ отрезка становится его корнем, остальные уходят в левую
+    или правую половину в зависимости от сравнения с этим корнем."""
+    keys = np.asarray(keys)
+    if keys.size == 0:
+        return []
+
+    # Повторная вставка ключа дерево не меняет, оставляем первое вхождение
+    _, first_index = np.unique(keys, return_index=True)
+    if first_index.size != keys.size:
+        keys = keys[np.sort(first_index)]
+    return _unique_depth_profile(keys)
+
+
+def _unique_depth_profile(keys):
+    """depth_profile для массива без повторяющихся ключей"""
+    # segment[i] - номер поддерева, в которое попадает ключ i на текущем уровне
+    segment = np.zeros(keys.size, dtype=np.int64)
+    segment_count = 1
+    profile = []
+
+    while keys.size:
+        m = keys.size
+        # Корень отрезка - ключ с наименьшим порядковым номером вставки
+        first = np.full(segment_count, m, dtype=np.int64)
+        np.minimum.at(first, segment, np.arange(m, dtype=np.int64))
+        roots = first[first < m]
+        profile.append(int(roots.size))
+
+        root_keys = np.empty(segment_count, dtype=keys.dtype)
+        root_keys[segment[roots]] = keys[roots]
+        goes_right = keys > root_keys[segment]
+
+        keep = np.ones(m, dtype=bool)
+        keep[roots] = False
+        child = (2 * segment + goes_right)[keep]
+        keys = keys[keep]
+
+        # Перенумеровываем непустые поддеревья подряд, чтобы номера не росли как 2^глубина
+        used = np.zeros(2 * segment_count, dtype=bool)
+        used[child] = True
+        renumber = np.cumsum(used) - 1
+        segment = renumber[child]
+        segment_count = max(int(used.sum()), 1)
+
+    return profile
+
+
+def bst_height(keys):
+    """Высота в ребрах, как у Node.height: пустое дерево -1"""
+    return len(depth_profile(keys)) - 1
+
+
+def average_depth(keys):
+    profile = depth_profile(keys)
+    total = sum(profile)
+    if total == 0:
+        return 0.0
+    return sum(depth * count for depth, count in enumerate(profile)) / total
+
+
+def simulate_heights(n, num_trials, seed=None):
+    """Высоты BST для num_trials случайных перестановок из n ключей.
+    Форма дерева зависит только от порядка ключей, поэтому берем перестановку 0..n-1."""
+    rng = np.random.default_rng(seed)
+    return [len(_unique_depth_profile(rng.permutation(n))) - 1 for _ in range(num_trials)]
@@ -0,0 +1,203 @@
+from bisect import bisect_left, bisect_right
+
+
+class _Leaf:
+    __slots__ = ("keys", "next")
+
+    def __init__(self, keys, next_leaf=None):
+        self.keys = keys
+        # Следующий лист: все листья связаны в список по возрастанию ключей
+        self.next = next_leaf
+
+
+class _Inner:
+    __slots__ = ("keys", "children")
+
+    def __init__(self, keys, children):
+        # В children[i] лежат ключи из [keys[i - 1], keys[i])
+        self.keys = keys
+        self.children = children
+
+
+class BPlusTree:
+    """B+-дерево: ключи хранятся только в листьях, каждый узел - отсортированный
+    список длиной до fanout, поиск внутри узла - bisect.
+
+    Вместо ~log2(n) узлов-объектов на пути AVL/RB здесь ~log_fanout(n) списков,
+    поэтому накладных расходов Python на узел и промахов кэша намного меньше.
+    Листья связаны в список: полный и диапазонный обходы идут без подъемов."""
+
+    def __init__(self, fanout=64):
+        if fanout < 3:
+            raise ValueError("fanout должен быть не меньше 3")
+        self.fanout = fanout
+        # Минимальное заполнение некорневых узлов
+        self._min_leaf = fanout // 2
+        self._min_children = (fanout + 1) // 2
+        self.root = _Leaf([])
+        self.size = 0
+        # Число уровней: спуск к листу - ровно levels - 1 шагов, без проверок типа узла
+        self.levels = 1
+
+    def __len__(self):
+        return self.size
+
+    def _find_leaf(self, key):
+        node = self.root
+        for _ in range(self.levels - 1):
+            node = node.children[bisect_right(node.keys, key)]
+        return node
+
+    def _find_path(self, key):
+        """Лист для key и путь к нему: список (внутренний узел, номер ребенка)"""
+        path = []
+        node = self.root
+        for _ in range(self.levels - 1):
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return node, path
+
+    def search(self, key):
+        """Есть ли ключ в дереве"""
+        # Спуск как в _find_leaf, но без лишнего вызова метода на каждый поиск
+        node = self.root
+        for _ in range(self.levels - 1):
+            node = node.children[bisect_right(node.keys, key)]
+        keys = node.keys
+        i = bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def insert(self, key):
+        """Вставка ключа, возвращает False, если он уже был"""
+        leaf, path = self._find_path(key)
+        keys = leaf.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return False
+        keys.insert(i, key)
+        self.size += 1
+        if len(keys) <= self.fanout:
+            return True
+
+        # Переполненный лист делится пополам, первый ключ правой половины уходит вверх
+        mid = len(keys) // 2
+        right = _Leaf(keys[mid:], leaf.next)
+        del keys[mid:]
+        leaf.next = right
+        separator = right.keys[0]
+
+        for node, i in reversed(path):
+            node.keys.insert(i, separator)
+            node.children.insert(i + 1, right)
+            if len(node.children) <= self.fanout:
+                return True
+            # Внутренний узел: средний ключ уходит вверх и в половинах не остается
+            mid = len(node.keys) // 2
+            separator = node.keys[mid]
+            right = _Inner(node.keys[mid + 1:], node.children[mid + 1:])
+            del node.keys[mid:]
+            del node.children[mid + 1:]
+
+        self.root = _Inner([separator], [self.root, right])
+        self.levels += 1
+        return True
+
+    def delete(self, key):
+        """Удаление ключа, возвращает True, если ключ был в дереве"""
+        leaf, path = self._find_path(key)
+        i = bisect_left(leaf.keys, key)
+        if i == len(leaf.keys) or leaf.keys[i] != key:
+            return False
+        del leaf.keys[i]
+        self.size -= 1
+
+        node = leaf
+        is_leaf = True
+        for parent, i in reversed(path):
+            if is_leaf:
+                if len(node.keys) >= self._min_leaf:
+                    break
+            elif len(node.children) >= self._min_children:
+                break
+
+            # Недозаполненный узел объединяется с соседом или забирает у него часть
+            if i > 0:
+                left, right, sep = parent.children[i - 1], node, i - 1
+            else:
+                left, right, sep = node, parent.children[i + 1], i
+
+            if is_leaf:
+                if len(left.keys) + len(right.keys) <= self.fanout:
+                    left.keys.extend(right.keys)
+                    left.next = right.next
+                    del parent.keys[sep]
+                    del parent.children[sep + 1]
+                else:
+                    keys = left.keys + right.keys
+                    half = len(keys) // 2
+                    left.keys[:] = keys[:half]
+                    right.keys[:] = keys[half:]
+                    parent.keys[sep] = right.keys[0]
+            else:
+                if len(left.children) + len(right.children) <= self.fanout:
+                    left.keys.append(parent.keys[sep])
+                    left.keys.extend(right.keys)
+                    left.children.extend(right.children)
+                    del parent.keys[sep]
+                    del parent.children[sep + 1]
+                else:
+                    # Разделитель из родителя опускается, новый поднимается на его место
+                    keys = left.keys + [parent.keys[sep]] + right.keys
+                    children = left.children + right.children
+                    half = len(children) // 2
+                    left.children[:] = children[:half]
+                    right.children[:] = children[half:]
+                    left.keys[:] = keys[:half - 1]
+                    parent.keys[sep] = keys[half - 1]
+                    right.keys[:] = keys[half:]
+
+            node = parent
+            is_leaf = False
+
+        # Корень с единственным ребенком больше не нужен
+        if self.levels > 1 and len(self.root.children) == 1:
+            self.root = self.root.children[0]
+            self.levels -= 1
+        return True
+
+    def _first_leaf(self):
+        node = self.root
+        for _ in range(self.levels - 1):
+            node = node.children[0]
+        return node
+
+    def __iter__(self):
+        """Все ключи по возрастанию - по списку листьев"""
+        leaf = self._first_leaf()
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    def inorder(self):
+        return list(self)
+
+    def range(self, lo, hi):
+        """Ключи из отрезка [lo, hi] по возрастанию"""
+        leaf = self._find_leaf(lo)
+        i = bisect_left(leaf.keys, lo)
+        while leaf is not None:
+            keys = leaf.keys
+            for j in range(i, len(keys)):
+                if keys[j] > hi:
+                    return
+                yield keys[j]
+            leaf = leaf.next
+            i = 0
+
+    def height(self):
+        """Высота в ребрах, как у Node.height: пустое дерево -1"""
+        return self.levels - 1 if self.size else -1
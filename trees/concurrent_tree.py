@@ -0,0 +1,154 @@
+import threading
+from contextlib import contextmanager
+from avl import AVL_Node
+from rb import RB_Node
+from persistent_avl import PersistentAVL_Node
+
+
+class ReadWriteLock:
+    """Много читателей или один писатель.
+    Ждущий писатель не пропускает новых читателей, чтобы не голодать."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentTree:
+    """Дерево, которое можно делить между потоками.
+
+    engine="avl" или "rb": изменяемые AVL_Node/RB_Node под ReadWriteLock,
+    читатели работают параллельно, писатель - монопольно.
+    engine="persistent": PersistentAVL_Node, писатели упорядочены мьютексом
+    и публикуют новый корень, а читатели берут текущий корень без блокировок -
+    старая версия дерева никогда не меняется."""
+
+    ENGINES = {
+        "avl": AVL_Node,
+        "rb": RB_Node,
+        "persistent": PersistentAVL_Node,
+    }
+
+    def __init__(self, engine="rb"):
+        if engine not in ConcurrentTree.ENGINES:
+            raise ValueError(f"Неизвестный движок: {engine}")
+        self.engine = engine
+        self._node_class = ConcurrentTree.ENGINES[engine]
+        self._lock_free_reads = engine == "persistent"
+        self._root = None
+        self._lock = ReadWriteLock()
+        self._write_mutex = threading.Lock()
+
+    @contextmanager
+    def _reading(self):
+        if self._lock_free_reads:
+            yield
+        else:
+            with self._lock.read_locked():
+                yield
+
+    @contextmanager
+    def _writing(self):
+        if self._lock_free_reads:
+            with self._write_mutex:
+                yield
+        else:
+            with self._lock.write_locked():
+                yield
+
+    def _insert_into(self, root, key):
+        """Корень дерева root после вставки key (вызывается под _writing)"""
+        if root is None:
+            if self._node_class is RB_Node:
+                return RB_Node(key, color=RB_Node.BLACK)
+            return self._node_class(key)
+        return root.insert(key)
+
+    @staticmethod
+    def _delete_from(root, key):
+        return root.delete(key) if root is not None else None
+
+    def insert(self, key):
+        with self._writing():
+            # Для персистентного дерева присваивание - атомарная публикация новой версии
+            self._root = self._insert_into(self._root, key)
+
+    def delete(self, key):
+        with self._writing():
+            self._root = self._delete_from(self._root, key)
+
+    def insert_many(self, keys):
+        """Пакетная вставка: блокировка берется один раз на весь пакет,
+        а новый корень публикуется один раз в конце - читатели без блокировок
+        видят либо версию до пакета, либо после него"""
+        with self._writing():
+            root = self._root
+            for key in keys:
+                root = self._insert_into(root, key)
+            self._root = root
+
+    def delete_many(self, keys):
+        with self._writing():
+            root = self._root
+            for key in keys:
+                root = self._delete_from(root, key)
+            self._root = root
+
+    def search(self, key):
+        """Есть ли ключ в дереве"""
+        with self._reading():
+            root = self._root
+            return root is not None and root.search(key) is not None
+
+    def inorder(self):
+        """Согласованный список ключей на момент вызова"""
+        with self._reading():
+            root = self._root
+            return list(root.iter_inorder(root)) if root is not None else []
+
+    def snapshot(self):
+        """Корень текущей версии (без блокировок безопасен только у engine="persistent")"""
+        return self._root
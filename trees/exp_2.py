@@ -1,8 +1,12 @@
 import random
 import math
-import matplotlib.pyplot as plt
+from contextlib import ExitStack, closing
+from functools import partial
 from avl import AVL_Node
-from rb import RB_Node
+from rb import RB_Node, RB_HeightNode
+from array_tree import ArrayAVL, ArrayRB, ArrayRBHeight
+from tree_stats import collect
+from exp_results import ResultLog, command, read_results, record_key, run_jobs
 
 def get_tree_height(node):
     if node is None:
@@ -10,78 +14,279 @@ def get_tree_height(node):
     return 1 + max(get_tree_height(node.left), get_tree_height(node.right))
 
 
-# Параметры эксперимента
-min_keys = 100
-max_keys = 10000
-step = 100
-num_trials = 10  # Количество экспериментов для усреднения
+def array_tree_height(tree_class, keys):
+    """Высота (в узлах) дерева на массивах, построенного из keys"""
+    tree = tree_class()
+    for key in keys:
+        tree.insert(key)
+    return tree.height() + 1
 
-key_counts = list(range(min_keys, max_keys + 1, step))
-avl_heights = []
-rbt_heights = []
-avl_upper_bound = []
-avl_lower_bound = []
-rbt_upper_bound = []
-rbt_lower_bound = []
 
-for n in key_counts:
-    print(f"Обрабатывается {n} ключей...")
+def rebuild_heights(keys, engine):
+    """Высоты (в узлах) AVL и RB деревьев, построенных заново из keys"""
+    if engine == "array":
+        return array_tree_height(ArrayAVL, keys), array_tree_height(ArrayRB, keys)
+
+    avl_root = AVL_Node(keys[0])
+    for key in keys[1:]:
+        avl_root = avl_root.insert(key)
+
+    rbt_root = RB_Node(keys[0])
+    for key in keys[1:]:
+        rbt_root.insert(key)
+        rbt_root = rbt_root.get_root()
+
+    return get_tree_height(avl_root), get_tree_height(rbt_root)
+
+
+def incremental_heights(keys, checkpoints, engine, count_operations=False):
+    """Высоты AVL и RB деревьев после вставки первых n ключей для каждого n из checkpoints.
+    Деревья строятся один раз и растут, высота читается из корня без обхода.
+    Генератор: на каждое n - словарь с avl_height, rbt_height и, если count_operations
+    (только engine = "objects"), накопленными счетчиками avl_counters/rbt_counters."""
+    if engine == "array":
+        avl_tree = ArrayAVL()
+        # Высоты хранятся в узлах обоих деревьев, проверка на каждом n стоит O(1)
+        rbt_tree = ArrayRBHeight()
+        inserted = 0
+        for n in checkpoints:
+            for key in keys[inserted:n]:
+                avl_tree.insert(key)
+                rbt_tree.insert(key)
+            inserted = n
+            yield {"avl_height": avl_tree.height() + 1, "rbt_height": rbt_tree.height() + 1}
+        return
+
+    avl_keys = keys
+    rbt_keys = keys
+    with ExitStack() as stack:
+        if count_operations:
+            # Счетчики включаются только на время этого прохода
+            avl_stats = stack.enter_context(collect(AVL_Node))
+            rbt_stats = stack.enter_context(collect(RB_HeightNode))
+            avl_keys = avl_stats.wrap_keys(keys)
+            rbt_keys = rbt_stats.wrap_keys(keys)
 
+        avl_root = AVL_Node(avl_keys[0])
+        rbt_root = RB_HeightNode(rbt_keys[0])
+        inserted = 1
+        for n in checkpoints:
+            for i in range(inserted, n):
+                avl_root = avl_root.insert(avl_keys[i])
+                rbt_root = rbt_root.insert(rbt_keys[i])
+            inserted = n
+            result = {"avl_height": avl_root.height, "rbt_height": rbt_root.height}
+            if count_operations:
+                result["avl_counters"] = avl_stats.as_dict()
+                result["rbt_counters"] = rbt_stats.as_dict()
+            yield result
+
+
+def average_results(results):
+    """Среднее по экспериментам для словарей из incremental_heights"""
+    average = {}
+    for name, value in results[0].items():
+        if isinstance(value, dict):
+            average[name] = {counter: sum(result[name][counter] for result in results) / len(results)
+                             for counter in value}
+        else:
+            average[name] = sum(result[name] for result in results) / len(results)
+    return average
+
+
+def average_trials(records, num_trials):
+    """Записи по отдельным экспериментам (с полем trial) -> средние по каждому n.
+    n, посчитанные еще не во всех экспериментах (прерванный прогон), пропускаются."""
+    by_n = {}
+    for record in records:
+        result = {name: value for name, value in record.items() if name not in ("n", "trial")}
+        by_n.setdefault(record["n"], []).append(result)
+    return [{"n": n, **average_results(results)}
+            for n, results in sorted(by_n.items()) if len(results) == num_trials]
+
+
+def trial_records(params, trial):
+    """Записи {"trial", "n", ...} одного эксперимента в режиме incremental, по одной на каждое n"""
+    key_counts = list(range(params["min_keys"], params["max_keys"] + 1, params["step"]))
+    engine = params["engine"]
+    counting = params["count_operations"] and engine == "objects"
+    print(f"Эксперимент {trial + 1} из {params['num_trials']}")
+    rng = random.Random(f"{params['seed']}-{trial}")
+    keys = rng.sample(range(1, 100 * params["max_keys"]), params["max_keys"])
+    with closing(incremental_heights(keys, key_counts, engine, counting)) as sweep:
+        for n, result in zip(key_counts, sweep):
+            yield {"trial": trial, "n": n, **result}
+
+
+def rebuild_records(params, n):
+    """Запись со средними высотами деревьев, построенных заново из n ключей"""
+    print(f"Обрабатывается {n} ключей...")
+    num_trials = params["num_trials"]
+    rng = random.Random(f"{params['seed']}-{n}")
     avl_height_sum = 0
     rbt_height_sum = 0
-
     for _ in range(num_trials):
-        keys = random.sample(range(1, 1000000), n)
-
-        avl_root = AVL_Node(keys[0])
-        for key in keys[1:]:
-            avl_root = avl_root.insert(key)
-        avl_height_sum += get_tree_height(avl_root)
-
-        rbt_root = RB_Node(keys[0])
-        for key in keys[1:]:
-            rbt_root.insert(key)
-            rbt_root = rbt_root.get_root()
-        rbt_height_sum += get_tree_height(rbt_root)
-
-    avl_heights.append(avl_height_sum / num_trials)
-    rbt_heights.append(rbt_height_sum / num_trials)
-
-    avl_upper_bound.append(1.44 * math.log2(n + 1))
-    avl_lower_bound.append(math.log2(n + 1))
-
-    rbt_upper_bound.append(2 * math.log2(n + 1))
-    rbt_lower_bound.append(math.log2(n + 1))
-
-plt.figure(figsize=(14, 6))
-
-plt.subplot(1, 2, 1)
-plt.plot(key_counts, avl_heights, 'b-', label='Экспериментальная высота AVL', linewidth=2)
-plt.plot(key_counts, avl_upper_bound, 'r--', label='Теоретическая верхняя оценка AVL', linewidth=1.5)
-plt.plot(key_counts, avl_lower_bound, 'g--', label='Теоретическая нижняя оценка AVL', linewidth=1.5)
-plt.xlabel('Количество ключей')
-plt.ylabel('Высота дерева')
-plt.title('Зависимость высоты AVL дерева от количества ключей')
-plt.legend()
-plt.grid(True, alpha=0.3)
-
-plt.subplot(1, 2, 2)
-plt.plot(key_counts, rbt_heights, 'b-', label='Экспериментальная высота RBT', linewidth=2)
-plt.plot(key_counts, rbt_upper_bound, 'r--', label='Теоретическая верхняя оценка RBT', linewidth=1.5)
-plt.plot(key_counts, rbt_lower_bound, 'g--', label='Теоретическая нижняя оценка RBT', linewidth=1.5)
-plt.xlabel('Количество ключей')
-plt.ylabel('Высота дерева')
-plt.title('Зависимость высоты красно-черного дерева от количества ключей')
-plt.legend()
-plt.grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.show()
-
-print(f"\nСтатистика для {max_keys} ключей:")
-print(f"AVL дерево - средняя экспериментальная высота: {avl_heights[-1]:.2f}")
-print(f"AVL дерево - теоретическая верхняя оценка: {avl_upper_bound[-1]:.2f}")
-print(f"AVL дерево - теоретическая нижняя оценка: {avl_lower_bound[-1]:.2f}")
-print(f"Красно-черное дерево - средняя экспериментальная высота: {rbt_heights[-1]:.2f}")
-print(f"Красно-черное дерево - теоретическая верхняя оценка: {rbt_upper_bound[-1]:.2f}")
-print(f"Красно-черное дерево - теоретическая нижняя оценка: {rbt_lower_bound[-1]:.2f}")
\ No newline at end of file
+        avl_height, rbt_height = rebuild_heights(rng.sample(range(1, 1000000), n), params["engine"])
+        avl_height_sum += avl_height
+        rbt_height_sum += rbt_height
+    yield {"n": n,
+           "avl_height": avl_height_sum / num_trials,
+           "rbt_height": rbt_height_sum / num_trials}
+
+
+def compute(path, params, workers=1):
+    """Расчет с записью в path по мере готовности каждого n; уже посчитанные n пропускаются.
+    workers > 1 - эксперименты (incremental) или n (rebuild) считаются в пуле процессов"""
+    key_counts = list(range(params["min_keys"], params["max_keys"] + 1, params["step"]))
+
+    with ResultLog(path, params) as log:
+        if params["sweep_mode"] == "incremental":
+            # Эксперименты идут по одному на процесс: в каждом процессе одна пара
+            # деревьев, и счетчики collect относятся только к текущему эксперименту.
+            # Ключи зависят только от seed и номера, поэтому после перезапуска
+            # деревья растут так же; уже посчитанные n доращиваются заново
+            # (это дешево: только вставки), но повторно не записываются.
+            if any(not isinstance(done, tuple) for done in log.done):
+                raise ValueError(f"{path}: средние по n из старой версии, удалите файл или укажите другой")
+            pending = [trial for trial in range(params["num_trials"])
+                       if not all((trial, n) in log.done for n in key_counts)]
+            job = partial(trial_records, params)
+        else:
+            pending = [n for n in key_counts if n not in log.done]
+            job = partial(rebuild_records, params)
+        for records in run_jobs(job, pending, workers):
+            for record in records:
+                if record_key(record) not in log.done:
+                    log.append(record)
+
+
+def plot_counters(plt, key_counts, avl_counters, rbt_counters):
+    """Накопленные счетчики работы алгоритмов рядом с графиками высоты"""
+    plt.figure(figsize=(14, 5))
+    panels = [
+        ("comparisons", "Сравнения ключей"),
+        ("rotations", "Повороты"),
+    ]
+    for i, (name, title) in enumerate(panels, start=1):
+        plt.subplot(1, 3, i)
+        plt.plot(key_counts, [c[name] for c in avl_counters], 'b-', label='AVL', linewidth=2)
+        plt.plot(key_counts, [c[name] for c in rbt_counters], 'r-', label='RBT', linewidth=2)
+        plt.xlabel('Количество ключей')
+        plt.title(title)
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+
+    plt.subplot(1, 3, 3)
+    plt.plot(key_counts, [c["recolors"] for c in rbt_counters], 'r-', label='Перекрашивания RBT', linewidth=2)
+    plt.plot(key_counts, [c["fixup_iterations"] for c in rbt_counters], 'm--',
+             label='Итерации fix_insertion RBT', linewidth=1.5)
+    plt.plot(key_counts, [c["rebalances"] for c in avl_counters], 'b--',
+             label='Балансировки AVL с поворотом', linewidth=1.5)
+    plt.xlabel('Количество ключей')
+    plt.title('Работа по восстановлению баланса')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+
+
+def plot(path, avl_title, rbt_title, height_label, figure_path=None, show=True):
+    """Графики по сохраненным результатам; matplotlib импортируется только здесь"""
+    import matplotlib.pyplot as plt
+
+    params, records = read_results(path)
+    if records and "trial" in records[0]:
+        records = average_trials(records, params["num_trials"])
+    if not records:
+        raise SystemExit(f"{path}: нет посчитанных результатов, сначала запустите compute")
+    key_counts = [record["n"] for record in records]
+    avl_heights = [record["avl_height"] for record in records]
+    rbt_heights = [record["rbt_height"] for record in records]
+
+    avl_upper_bound = []
+    avl_lower_bound = []
+    rbt_upper_bound = []
+    rbt_lower_bound = []
+    for n in key_counts:
+        avl_upper_bound.append(1.44 * math.log2(n + 1))
+        avl_lower_bound.append(math.log2(n + 1))
+
+        rbt_upper_bound.append(2 * math.log2(n + 1))
+        rbt_lower_bound.append(math.log2(n + 1))
+
+    plt.figure(figsize=(14, 6))
+
+    plt.subplot(1, 2, 1)
+    plt.plot(key_counts, avl_heights, 'b-', label=f'{height_label} AVL', linewidth=2)
+    plt.plot(key_counts, avl_upper_bound, 'r--', label='Теоретическая верхняя оценка AVL', linewidth=1.5)
+    plt.plot(key_counts, avl_lower_bound, 'g--', label='Теоретическая нижняя оценка AVL', linewidth=1.5)
+    plt.xlabel('Количество ключей')
+    plt.ylabel('Высота дерева')
+    plt.title(avl_title)
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+
+    plt.subplot(1, 2, 2)
+    plt.plot(key_counts, rbt_heights, 'b-', label=f'{height_label} RBT', linewidth=2)
+    plt.plot(key_counts, rbt_upper_bound, 'r--', label='Теоретическая верхняя оценка RBT', linewidth=1.5)
+    plt.plot(key_counts, rbt_lower_bound, 'g--', label='Теоретическая нижняя оценка RBT', linewidth=1.5)
+    plt.xlabel('Количество ключей')
+    plt.ylabel('Высота дерева')
+    plt.title(rbt_title)
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    if figure_path:
+        plt.savefig(figure_path)
+    if "avl_counters" in records[0]:
+        plot_counters(plt, key_counts,
+                      [record["avl_counters"] for record in records],
+                      [record["rbt_counters"] for record in records])
+    if show:
+        plt.show()
+
+    label = height_label.lower()
+    print(f"\nСтатистика для {key_counts[-1]} ключей:")
+    print(f"AVL дерево - {label}: {avl_heights[-1]:.2f}")
+    print(f"AVL дерево - теоретическая верхняя оценка: {avl_upper_bound[-1]:.2f}")
+    print(f"AVL дерево - теоретическая нижняя оценка: {avl_lower_bound[-1]:.2f}")
+    print(f"Красно-черное дерево - {label}: {rbt_heights[-1]:.2f}")
+    print(f"Красно-черное дерево - теоретическая верхняя оценка: {rbt_upper_bound[-1]:.2f}")
+    print(f"Красно-черное дерево - теоретическая нижняя оценка: {rbt_lower_bound[-1]:.2f}")
+
+
+# Параметры эксперимента
+# Движок хранения: "objects" - AVL_Node/RB_Node, "array" - ArrayAVL/ArrayRB из array_tree.py
+engine = "objects"
+# Режим: "incremental" - одно растущее дерево на эксперимент, "rebuild" - новое дерево для каждого n
+sweep_mode = "incremental"
+min_keys = 100
+max_keys = 10000
+step = 100
+# Счетчики сравнений, поворотов и перекрашиваний (tree_stats.py) - отдельным графиком,
+# только в режиме "incremental" с engine = "objects"
+count_operations = False
+num_trials = 10  # Количество экспериментов для усреднения
+seed = 0
+# Число процессов для расчета; результаты от него не зависят
+workers = 1
+# Результаты пишутся построчно (JSON lines), повторный запуск с теми же
+# параметрами продолжает прерванный расчет с первого непосчитанного n
+results_path = "exp_2.jsonl"
+figure_path = "exp_2.png"
+show_plots = True
+
+if __name__ == "__main__":
+    # python exp_2.py [compute|plot|all]: на сервере без дисплея - compute,
+    # графики потом отдельным шагом plot
+    step_name = command()
+    if step_name in ("compute", "all"):
+        compute(results_path, {
+            "engine": engine, "sweep_mode": sweep_mode, "min_keys": min_keys, "max_keys": max_keys,
+            "step": step, "count_operations": count_operations, "num_trials": num_trials, "seed": seed,
+        }, workers)
+    if step_name in ("plot", "all"):
+        plot(results_path,
+             'Зависимость высоты AVL дерева от количества ключей',
+             'Зависимость высоты красно-черного дерева от количества ключей',
+             'Средняя экспериментальная высота', figure_path, show_plots)
@@ -1,83 +1,59 @@
-import math
-import matplotlib.pyplot as plt
-from avl import AVL_Node
-from rb import RB_Node
-
-
-def get_tree_height(node):
-    """Рекурсивно вычисляет высоту дерева"""
-    if node is None:
-        return 0
-    return 1 + max(get_tree_height(node.left), get_tree_height(node.right))
+from exp_2 import incremental_heights, plot, rebuild_heights
+from exp_results import ResultLog, command
+
+
+def compute(path, params):
+    """Расчет с записью в path по мере готовности каждого n; уже посчитанные n пропускаются"""
+    key_counts = list(range(params["min_keys"], params["max_keys"] + 1, params["step"]))
+    engine = params["engine"]
+
+    with ResultLog(path, params) as log:
+        if params["sweep_mode"] == "incremental":
+            # Ключи 1..n - префикс ключей 1..max_keys, поэтому одного дерева хватает на весь проход.
+            # После перезапуска уже посчитанные n доращиваются заново, но не записываются.
+            keys = list(range(1, params["max_keys"] + 1))
+            counting = params["count_operations"] and engine == "objects"
+            for n, result in zip(key_counts, incremental_heights(keys, key_counts, engine, counting)):
+                if n not in log.done:
+                    print(f"Обработано {n} ключей")
+                    log.append({"n": n, **result})
+        else:
+            for n in key_counts:
+                if n in log.done:
+                    continue
+                print(f"Обрабатывается {n} ключей...")
+                avl_height, rbt_height = rebuild_heights(list(range(1, n + 1)), engine)
+                log.append({"n": n, "avl_height": avl_height, "rbt_height": rbt_height})
 
 
 # Параметры эксперимента
+# Движок хранения: "objects" - AVL_Node/RB_Node, "array" - ArrayAVL/ArrayRB из array_tree.py
+engine = "objects"
+# Режим: "incremental" - одно растущее дерево, "rebuild" - новое дерево для каждого n
+sweep_mode = "incremental"
 min_keys = 100
 max_keys = 10000
 step = 100
-
-key_counts = list(range(min_keys, max_keys + 1, step))
-avl_heights = []
-rbt_heights = []
-avl_upper_bound = []
-avl_lower_bound = []
-rbt_upper_bound = []
-rbt_lower_bound = []
-
-for n in key_counts:
-    print(f"Обрабатывается {n} ключей...")
-
-    avl_height_sum = 0
-    rbt_height_sum = 0
-    keys = list(range(1, n + 1))
-
-    avl_root = AVL_Node(keys[0])
-    for key in keys[1:]:
-        avl_root = avl_root.insert(key)
-
-    rbt_root = RB_Node(keys[0])
-    for key in keys[1:]:
-        rbt_root.insert(key)
-        rbt_root = rbt_root.get_root()
-
-    avl_heights.append(get_tree_height(avl_root))
-    rbt_heights.append(get_tree_height(rbt_root))
-
-    avl_upper_bound.append(1.44 * math.log2(n + 1))
-    avl_lower_bound.append(math.log2(n + 1))
-
-    rbt_upper_bound.append(2 * math.log2(n + 1))
-    rbt_lower_bound.append(math.log2(n + 1))
-
-plt.figure(figsize=(14, 6))
-
-plt.subplot(1, 2, 1)
-plt.plot(key_counts, avl_heights, 'b-', label='Экспериментальная высота AVL', linewidth=2)
-plt.plot(key_counts, avl_upper_bound, 'r--', label='Теоретическая верхняя оценка AVL', linewidth=1.5)
-plt.plot(key_counts, avl_lower_bound, 'g--', label='Теоретическая нижняя оценка AVL', linewidth=1.5)
-plt.xlabel('Количество ключей')
-plt.ylabel('Высота дерева')
-plt.title('Зависимость высоты AVL дерева\n(монотонно возрастающие ключи)')
-plt.legend()
-plt.grid(True, alpha=0.3)
-
-plt.subplot(1, 2, 2)
-plt.plot(key_counts, rbt_heights, 'b-', label='Экспериментальная высота RBT', linewidth=2)
-plt.plot(key_counts, rbt_upper_bound, 'r--', label='Теоретическая верхняя оценка RBT', linewidth=1.5)
-plt.plot(key_counts, rbt_lower_bound, 'g--', label='Теоретическая нижняя оценка RBT', linewidth=1.5)
-plt.xlabel('Количество ключей')
-plt.ylabel('Высота дерева')
-plt.title('Зависимость высоты красно-черного дерева\n(монотонно возрастающие ключи)')
-plt.legend()
-plt.grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.show()
-
-print(f"\nСтатистика для {max_keys} ключей:")
-print(f"AVL дерево - экспериментальная высота: {avl_heights[-1]:.2f}")
-print(f"AVL дерево - теоретическая верхняя оценка: {avl_upper_bound[-1]:.2f}")
-print(f"AVL дерево - теоретическая нижняя оценка: {avl_lower_bound[-1]:.2f}")
-print(f"Красно-черное дерево - экспериментальная высота: {rbt_heights[-1]:.2f}")
-print(f"Красно-черное дерево - теоретическая верхняя оценка: {rbt_upper_bound[-1]:.2f}")
-print(f"Красно-черное дерево - теоретическая нижняя оценка: {rbt_lower_bound[-1]:.2f}")
\ No newline at end of file
+# Счетчики сравнений, поворотов и перекрашиваний (tree_stats.py) - отдельным графиком,
+# только в режиме "incremental" с engine = "objects"
+count_operations = False
+# Результаты пишутся построчно (JSON lines), повторный запуск с теми же
+# параметрами продолжает прерванный расчет с первого непосчитанного n
+results_path = "exp_3.jsonl"
+figure_path = "exp_3.png"
+show_plots = True
+
+if __name__ == "__main__":
+    # python exp_3.py [compute|plot|all]: на сервере без дисплея - compute,
+    # графики потом отдельным шагом plot
+    step_name = command()
+    if step_name in ("compute", "all"):
+        compute(results_path, {
+            "engine": engine, "sweep_mode": sweep_mode, "min_keys": min_keys, "max_keys": max_keys,
+            "step": step, "count_operations": count_operations,
+        })
+    if step_name in ("plot", "all"):
+        plot(results_path,
+             'Зависимость высоты AVL дерева\n(монотонно возрастающие ключи)',
+             'Зависимость высоты красно-черного дерева\n(монотонно возрастающие ключи)',
+             'Экспериментальная высота', figure_path, show_plots)
@@ -0,0 +1,134 @@
+import random
+import time
+from collections import Counter
+from avl import AVL_Node
+
+
+class RecursiveAVL_Node(AVL_Node):
+    """Прежние рекурсивные insert/delete: rebalance на каждом предке до корня"""
+    __slots__ = ()
+
+    def insert(self, key):
+        if key < self.key:
+            if self.left is None:
+                self.left = type(self)(key, self)
+            else:
+                self.left = self.left.insert(key)
+        elif key > self.key:
+            if self.right is None:
+                self.right = type(self)(key, self)
+            else:
+                self.right = self.right.insert(key)
+        else:
+            return self
+
+        return self.rebalance()
+
+    def delete(self, key):
+        if key < self.key:
+            if self.left:
+                self.left = self.left.delete(key)
+        elif key > self.key:
+            if self.right:
+                self.right = self.right.delete(key)
+        else:
+            if self.left is None and self.right is None:
+                return None
+            elif self.left is None:
+                self.right.parent = self.parent
+                return self.right
+            elif self.right is None:
+                self.left.parent = self.parent
+                return self.left
+            else:
+                successor = self.right
+                while successor.left:
+                    successor = successor.left
+                self.key = successor.key
+                self.right = self.right.delete(successor.key)
+
+        return self.rebalance()
+
+
+class CallCounter:
+    """Подсчет вызовов update_height и rebalance у наследников"""
+    __slots__ = ()
+    calls = Counter()
+
+    def update_height(self):
+        CallCounter.calls["update_height"] += 1
+        super().update_height()
+
+    def rebalance(self):
+        CallCounter.calls["rebalance"] += 1
+        return super().rebalance()
+
+
+class CountingAVL_Node(CallCounter, AVL_Node):
+    __slots__ = ()
+
+
+class CountingRecursiveAVL_Node(CallCounter, RecursiveAVL_Node):
+    __slots__ = ()
+
+
+def run(node_class, inserts, deletes):
+    """Вставка inserts, затем удаление deletes; (время вставок, время удалений)"""
+    start = time.perf_counter()
+    root = node_class(inserts[0])
+    for key in inserts[1:]:
+        root = root.insert(key)
+        # Рекурсивная версия возвращает корень поддерева - ищем настоящий корень
+        while root.parent is not None:
+            root = root.parent
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in deletes:
+        root = root.delete(key)
+        while root is not None and root.parent is not None:
+            root = root.parent
+    return insert_time, time.perf_counter() - start
+
+
+def count_calls(node_class, inserts, deletes):
+    CallCounter.calls.clear()
+    root = node_class(inserts[0])
+    for key in inserts[1:]:
+        root = root.insert(key)
+        while root.parent is not None:
+            root = root.parent
+    insert_calls = Counter(CallCounter.calls)
+
+    CallCounter.calls.clear()
+    for key in deletes:
+        root = root.delete(key)
+        while root is not None and root.parent is not None:
+            root = root.parent
+    return insert_calls, Counter(CallCounter.calls)
+
+
+# Параметры эксперимента
+n = 200000
+
+if __name__ == "__main__":
+    workloads = [
+        ("случайные", random.sample(range(1, 10 * n), n)),
+        ("возрастающие", list(range(1, n + 1))),
+    ]
+    for name, keys in workloads:
+        deletes = random.sample(keys, n // 2)
+        print(f"Ключи: {name}, n = {n}, удаляется {len(deletes)}")
+
+        old_inserts, old_deletes = count_calls(CountingRecursiveAVL_Node, keys, deletes)
+        new_inserts, new_deletes = count_calls(CountingAVL_Node, keys, deletes)
+        for operation, ops, old, new in [("вставка", len(keys), old_inserts, new_inserts),
+                                         ("удаление", len(deletes), old_deletes, new_deletes)]:
+            for method in ("update_height", "rebalance"):
+                print(f"   {operation:<9} {method:<14} рекурсивно: {old[method] / ops:6.2f} на операцию, "
+                      f"итеративно: {new[method] / ops:6.2f}, меньше в {old[method] / max(new[method], 1):.1f} раз")
+
+        old_insert_time, old_delete_time = run(RecursiveAVL_Node, keys, deletes)
+        new_insert_time, new_delete_time = run(AVL_Node, keys, deletes)
+        print(f"   Время вставки: {old_insert_time:.2f} с -> {new_insert_time:.2f} с, "
+              f"удаления: {old_delete_time:.2f} с -> {new_delete_time:.2f} с")
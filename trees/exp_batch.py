@@ -0,0 +1,37 @@
+import random
+import time
+import numpy as np
+from avl import AVL_Node
+from rb import RB_Node
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Параметры эксперимента
+n = 10 ** 6
+batch_sizes = [1000, 10000, 100000, 1000000]
+repeats = 3
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    keys = rng.sample(range(1, 4 * n), n)
+    for node_class in (AVL_Node, RB_Node):
+        root = node_class.from_sorted(keys)
+        print(f"{node_class.__name__}, n = {n}")
+        print(f"   {'Пачка':>8}{'search, с':>12}{'search_many, с':>16}{'numpy, с':>12}")
+        for m in batch_sizes:
+            # Примерно четверть запросов - попадания
+            queries = [rng.randrange(1, 4 * n) for _ in range(m)]
+            query_array = np.array(queries)
+            assert root.search_many(query_array) == [root.search(key) for key in queries]
+            loop_time = best_time(lambda: [root.search(key) for key in queries], repeats)
+            batch_time = best_time(lambda: root.search_many(queries), repeats)
+            array_time = best_time(lambda: root.search_many(query_array), repeats)
+            print(f"   {m:>8}{loop_time:>12.4f}{batch_time:>16.4f}{array_time:>12.4f}")
@@ -1,49 +1,108 @@
-from bst import Node
+from bst import TrackedBST, build_bst
+from array_tree import ArrayBST
+from exp_results import ResultLog, command, read_results, run_jobs
+import bst_sim
 import random
-import matplotlib.pyplot as plt
 import math
+from functools import partial
 
 
-def build_bst(keys):
-    if not keys:
-        return None
-    root = Node(keys[0])
-    for key in keys[1:]:
-        root.insert(root,key)
-    return root
+def bst_height(keys, engine):
+    """Высота BST из ключей keys на выбранном движке хранения"""
+    if engine == "sim":
+        return bst_sim.bst_height(keys)
+    if engine == "array":
+        tree = ArrayBST()
+        for key in keys:
+            tree.insert(key)
+        return tree.height()
+    if engine == "tracked":
+        # Высоту отслеживает само дерево при вставках, обход после построения не нужен
+        return TrackedBST(keys).height()
+    root = build_bst(keys)
+    return root.height(root)
 
-min_n = 100
-max_n = 10000
-step = 100
-num_trials = 20
-
-n_values = list(range(min_n, max_n + 1, step))
-heights = []
 
-for n in n_values:
-    total_height = 0
+def height_records(params, n):
+    """Запись со средней высотой BST из n случайных ключей"""
     print(f"Обработка {n} ключей.")
+    # Свой генератор на каждое n: результат не зависит от того, с какого n начат запуск
+    # и в каком процессе считается n
+    rng = random.Random(f"{params['seed']}-{n}")
+    num_trials = params["num_trials"]
+    total_height = 0
     for _ in range(num_trials):
-        keys = random.sample(range(1, 1000000), n)
-        root = build_bst(keys)
-        total_height += root.height(root)
-    heights.append(total_height / num_trials)
+        keys = rng.sample(range(1, 1000000), n)
+        total_height += bst_height(keys, params["engine"])
+    yield {"n": n, "height": total_height / num_trials}
+
+
+def compute(path, params, workers=1):
+    """Расчет с записью в path по мере готовности каждого n; уже посчитанные n пропускаются.
+    workers > 1 - разные n считаются в пуле процессов"""
+    with ResultLog(path, params) as log:
+        pending = [n for n in range(params["min_n"], params["max_n"] + 1, params["step"])
+                   if n not in log.done]
+        for records in run_jobs(partial(height_records, params), pending, workers):
+            for record in records:
+                log.append(record)
 
 
-plt.figure(figsize=(12, 8))
-plt.plot(n_values, heights, 'b-', label='Экспериментальная высота', linewidth=2)
+def plot(path, figure_path=None, show=True):
+    """График по сохраненным результатам; matplotlib импортируется только здесь"""
+    import matplotlib.pyplot as plt
 
-plt.plot(n_values, [2.2 * math.log2(n) for n in n_values], 'g--', label='2.2 log₂(n)')
+    _, records = read_results(path)
+    if not records:
+        raise SystemExit(f"{path}: нет посчитанных результатов, сначала запустите compute")
+    n_values = [record["n"] for record in records]
+    heights = [record["height"] for record in records]
 
-plt.xlabel('Количество ключей (n)')
-plt.ylabel('Высота дерева')
-plt.title('Зависимость высоты BST от количества ключей')
-plt.legend()
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.show()
+    plt.figure(figsize=(12, 8))
+    plt.plot(n_values, heights, 'b-', label='Экспериментальная высота', linewidth=2)
+
+    plt.plot(n_values, [2.2 * math.log2(n) for n in n_values], 'g--', label='2.2 log₂(n)')
+
+    plt.xlabel('Количество ключей (n)')
+    plt.ylabel('Высота дерева')
+    plt.title('Зависимость высоты BST от количества ключей')
+    plt.legend()
+    plt.grid(True, linestyle='--', alpha=0.7)
+    if figure_path:
+        plt.savefig(figure_path)
+    if show:
+        plt.show()
+
+
+# Движок хранения: "objects" - узлы Node, "array" - ArrayBST из array_tree.py,
+# "sim" - высота считается по массиву ключей без построения узлов (bst_sim.py),
+# "tracked" - TrackedBST из bst.py, высота известна сразу после вставок. При одном
+# запросе высоты на дерево "objects" быстрее: обход по уровням дешевле учета глубин.
+engine = "objects"
+min_n = 100
+max_n = 10000
+step = 100
+num_trials = 20
+seed = 0
+# Число процессов для расчета; результаты от него не зависят
+workers = 1
+# Результаты пишутся построчно (JSON lines), повторный запуск с теми же
+# параметрами продолжает прерванный расчет с первого непосчитанного n
+results_path = "exp_bst.jsonl"
+figure_path = "exp_bst.png"
+show_plots = True
 
+if __name__ == "__main__":
+    # python exp_bst.py [compute|plot|all]: на сервере без дисплея - compute,
+    # графики потом отдельным шагом plot
+    step_name = command()
+    if step_name in ("compute", "all"):
+        compute(results_path, {"engine": engine, "min_n": min_n, "max_n": max_n, "step": step,
+                               "num_trials": num_trials, "seed": seed}, workers)
+    if step_name in ("plot", "all"):
+        plot(results_path, figure_path, show_plots)
 
-print("Асимптотика высоты BST:")
-print("- В худшем случае (несбалансированное дерево): O(n)")
-print("- В среднем случае для случайных ключей: O(log n)")
-print("- Эксперимент подтверждает логарифмический рост высоты")
\ No newline at end of file
+        print("Асимптотика высоты BST:")
+        print("- В худшем случае (несбалансированное дерево): O(n)")
+        print("- В среднем случае для случайных ключей: O(log n)")
+        print("- Эксперимент подтверждает логарифмический рост высоты")
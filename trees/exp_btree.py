@@ -0,0 +1,69 @@
+import random
+import time
+from bst import Node, build_tree
+from avl import AVL_Node
+from rb import RB_Node
+from btree import BPlusTree
+
+
+def build_btree(fanout, keys):
+    tree = BPlusTree(fanout)
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def measure(name, build, search, traverse, keys, queries):
+    """Строка результатов: высота (в ребрах) и оп/с вставки, поиска и полного обхода"""
+    build_time, tree = timed(build, keys)
+    search_time, _ = timed(lambda: [search(tree, key) for key in queries])
+    traverse_time, count = timed(traverse, tree)
+    assert count == len(keys)
+    # Node.height напрямую: у AVL_Node атрибут height закрывает метод
+    height = tree.height() if isinstance(tree, BPlusTree) else Node.height(tree, tree)
+    return {
+        "name": name,
+        "height": height,
+        "insert_ops": len(keys) / build_time,
+        "search_ops": len(queries) / search_time,
+        "scan_keys": count / traverse_time,
+    }
+
+
+# Параметры эксперимента
+sizes = [10 ** 5, 10 ** 6]
+fanouts = [16, 64, 256]
+num_queries = 200000
+
+if __name__ == "__main__":
+    for n in sizes:
+        keys = random.sample(range(1, 10 * n), n)
+        # Половина запросов - попадания, половина - промахи
+        queries = random.sample(keys, num_queries // 2) + random.sample(range(10 * n, 20 * n), num_queries // 2)
+        random.shuffle(queries)
+
+        rows = []
+        for node_class in (AVL_Node, RB_Node):
+            rows.append(measure(node_class.__name__,
+                                lambda keys, cls=node_class: build_tree(cls, keys),
+                                lambda root, key: root.search(key),
+                                lambda root: sum(1 for _ in root.iter_inorder(root)),
+                                keys, queries))
+        for fanout in fanouts:
+            rows.append(measure(f"BPlusTree({fanout})",
+                                lambda keys, fanout=fanout: build_btree(fanout, keys),
+                                lambda tree, key: tree.search(key),
+                                lambda tree: sum(1 for _ in tree),
+                                keys, queries))
+
+        print(f"n = {n}")
+        print(f"   {'Дерево':<16}{'Высота':>8}{'Вставка, оп/с':>16}{'Поиск, оп/с':>14}{'Обход, ключ/с':>16}")
+        for row in rows:
+            print(f"   {row['name']:<16}{row['height']:>8}{row['insert_ops']:>16.0f}"
+                  f"{row['search_ops']:>14.0f}{row['scan_keys']:>16.0f}")
@@ -0,0 +1,61 @@
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent_tree import ConcurrentTree
+
+
+def worker(tree, ops, read_ratio, key_range, batch_size, seed):
+    """Смесь поисков и вставок; вставки идут пакетами через insert_many"""
+    rng = random.Random(seed)
+    batch = []
+    for _ in range(ops):
+        key = rng.randrange(key_range)
+        if rng.random() < read_ratio:
+            tree.search(key)
+        else:
+            batch.append(key)
+            if len(batch) >= batch_size:
+                tree.insert_many(batch)
+                batch = []
+    if batch:
+        tree.insert_many(batch)
+
+
+def throughput(engine, threads, read_ratio, prefill, ops_per_thread, batch_size):
+    tree = ConcurrentTree(engine)
+    key_range = 4 * prefill
+    tree.insert_many(random.sample(range(key_range), prefill))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(worker, tree, ops_per_thread, read_ratio, key_range, batch_size, i)
+                   for i in range(threads)]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return threads * ops_per_thread / elapsed
+
+
+def gil_enabled():
+    # В сборках без GIL (3.13t и новее) есть sys._is_gil_enabled
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+# Параметры эксперимента
+engines = ["rb", "avl", "persistent"]
+thread_counts = [1, 2, 4, 8]
+read_ratios = [0.5, 0.9, 0.99]
+prefill = 100000
+ops_per_thread = 20000
+batch_size = 64
+
+if __name__ == "__main__":
+    print(f"Python {sys.version.split()[0]}, GIL {'включен' if gil_enabled() else 'выключен'}")
+    print(f"{'Движок':<12}{'Чтения':>8}" + "".join(f"{f'{t} пот.':>12}" for t in thread_counts))
+    for engine in engines:
+        for read_ratio in read_ratios:
+            row = [throughput(engine, t, read_ratio, prefill, ops_per_thread, batch_size)
+                   for t in thread_counts]
+            print(f"{engine:<12}{read_ratio:>8.2f}" + "".join(f"{ops:>12.0f}" for ops in row))
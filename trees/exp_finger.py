@@ -0,0 +1,66 @@
+import random
+import time
+from avl import AVL_Node
+from rb import RB_Node
+from finger import FingerTree
+from bst import Node, build_tree
+
+
+def insert_with_finger(node_class, keys):
+    tree = FingerTree(node_class)
+    for key in keys:
+        tree.insert(key)
+    return tree.root
+
+
+def clustered_keys(n, cluster_size=32):
+    """Ключи группами: внутри группы близкие, сами группы в случайном порядке"""
+    starts = list(range(0, n * 4, cluster_size * 4))
+    random.shuffle(starts)
+    keys = []
+    for start in starts:
+        keys.extend(random.sample(range(start, start + cluster_size * 4), cluster_size))
+    return keys[:n]
+
+
+def timed(build, node_class, keys):
+    start = time.perf_counter()
+    root = build(node_class, keys)
+    return time.perf_counter() - start, root
+
+
+# Параметры эксперимента
+n = 200000
+
+if __name__ == "__main__":
+    workloads = [
+        ("возрастающие (exp_3.py)", list(range(1, n + 1))),
+        ("группами", clustered_keys(n)),
+        ("случайные", random.sample(range(1, 10 * n), n)),
+    ]
+    for name, keys in workloads:
+        print(f"Ключи: {name}, n = {len(keys)}")
+        for node_class in (AVL_Node, RB_Node):
+            # Вставка как в exp_3.py: каждый раз от корня
+            root_time, root = timed(build_tree, node_class, keys)
+            finger_time, finger_root = timed(insert_with_finger, node_class, keys)
+            # Node.height напрямую: у AVL_Node атрибут height закрывает метод
+            same_shape = Node.height(root, root) == Node.height(finger_root, finger_root)
+            print(f"   {node_class.__name__:<9} от корня: {root_time:.2f} с, с пальцем: {finger_time:.2f} с, "
+                  f"ускорение: {root_time / finger_time:.2f}x, высоты совпадают: {same_shape}")
+
+    # Поиск всех ключей по порядку
+    keys = list(range(1, n + 1))
+    tree = FingerTree(RB_Node)
+    for key in keys:
+        tree.insert(key)
+    start = time.perf_counter()
+    for key in keys:
+        tree.root.search(key)
+    root_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        tree.search(key)
+    finger_time = time.perf_counter() - start
+    print(f"Последовательный поиск в RB: от корня {root_time:.2f} с, с пальцем {finger_time:.2f} с, "
+          f"ускорение: {root_time / finger_time:.2f}x")
@@ -0,0 +1,50 @@
+import time
+import numpy as np
+from rb import RB_Node
+from frozen import FrozenTree
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+# Параметры эксперимента
+sizes = [10 ** 6, 10 ** 7, 10 ** 8]
+# Дерево из узлов-объектов строится только для этих размеров: 10^8 узлов не помещаются в память
+tree_sizes = [10 ** 6, 10 ** 7]
+num_queries = 10 ** 6
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        # Четные ключи: половина запросов - попадания, половина - промахи
+        keys = np.arange(0, 2 * n, 2, dtype=np.int64)
+        queries = rng.integers(0, 2 * n, size=num_queries)
+        print(f"n = {n}, запросов {num_queries}")
+
+        if n in tree_sizes:
+            root = RB_Node.from_sorted(keys.tolist())
+            query_list = queries.tolist()
+            build_time, frozen = timed(root.freeze)
+            search_time, found = timed(lambda: [root.search(key) is not None for key in query_list])
+            print(f"   {'RB_Node.search':<24}{search_time:8.3f} с")
+            print(f"   {'RB_Node.freeze':<24}{build_time:8.3f} с")
+            del root
+        else:
+            build_time, frozen = timed(FrozenTree, keys)
+            found = None
+            print(f"   {'FrozenTree из массива':<24}{build_time:8.3f} с")
+
+        contains_time, contains = timed(frozen.contains, queries)
+        bound_time, bounds = timed(frozen.lower_bound, queries)
+        sorted_time, expected = timed(np.searchsorted, keys, queries)
+        assert np.array_equal(bounds, expected)
+        assert np.array_equal(contains, queries % 2 == 0)
+        if found is not None:
+            assert contains.tolist() == found
+        print(f"   {'FrozenTree.contains':<24}{contains_time:8.3f} с")
+        print(f"   {'FrozenTree.lower_bound':<24}{bound_time:8.3f} с")
+        print(f"   {'np.searchsorted':<24}{sorted_time:8.3f} с")
+        del frozen
@@ -0,0 +1,35 @@
+import random
+import tracemalloc
+from functools import partial
+from bst import build_bst, build_tree
+from avl import AVL_Node
+from rb import RB_Node
+
+
+def bytes_per_node(build, keys):
+    """Сколько байт в среднем занимает один узел дерева (без самих ключей)"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    root = build(keys)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del root
+    return (after - before) / len(keys)
+
+
+# Параметры эксперимента
+key_counts = [10 ** 5, 10 ** 6]
+builders = [
+    ("BST", build_bst),
+    ("AVL", partial(build_tree, AVL_Node)),
+    ("RB", partial(build_tree, RB_Node)),
+]
+
+if __name__ == "__main__":
+    print(f"{'Дерево':<8}{'Ключей':>10}{'Байт/узел':>12}")
+    for n in key_counts:
+        # Ключи создаются до начала замера, чтобы учитывать только узлы
+        keys = random.sample(range(1, 10 * n), n)
+        for name, build in builders:
+            size = bytes_per_node(build, keys)
+            print(f"{name:<8}{n:>10}{size:>12.1f}")
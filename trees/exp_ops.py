@@ -0,0 +1,235 @@
+import json
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+from functools import partial
+from bst import build_bst, build_tree
+from avl import AVL_Node
+from rb import RB_Node
+from btree import BPlusTree
+
+
+# Ключи в деревьях четные, поэтому нечетные ключи гарантированно промахи
+def random_keys(n, rng):
+    return [2 * k for k in rng.sample(range(10 * n), n)]
+
+
+def sorted_keys(n, rng):
+    return [2 * k for k in range(n)]
+
+
+def reverse_keys(n, rng):
+    return [2 * k for k in range(n - 1, -1, -1)]
+
+
+def nearly_sorted_keys(n, rng, swaps=0.01):
+    """Отсортированные ключи, в которых переставлено около swaps * n случайных пар"""
+    keys = sorted_keys(n, rng)
+    for _ in range(max(1, int(n * swaps))):
+        i, j = rng.randrange(n), rng.randrange(n)
+        keys[i], keys[j] = keys[j], keys[i]
+    return keys
+
+
+def zipf_keys(n, rng, s=1.0):
+    """Поток из n ключей с частотами по закону Ципфа: часть ключей повторяется,
+    уникальных в дереве будет меньше n"""
+    values = random_keys(n, rng)
+    cum_weights = list(accumulate(1 / rank ** s for rank in range(1, n + 1)))
+    return rng.choices(values, cum_weights=cum_weights, k=n)
+
+
+DISTRIBUTIONS = {
+    "random": random_keys,
+    "sorted": sorted_keys,
+    "reverse": reverse_keys,
+    "nearly-sorted": nearly_sorted_keys,
+    "zipf": zipf_keys,
+}
+
+# Распределения, на которых обычное BST вырождается в список
+ORDERED_DISTRIBUTIONS = {"sorted", "reverse", "nearly-sorted"}
+
+
+def balanced_delete(root, keys):
+    for key in keys:
+        if root is None:
+            break
+        root = root.delete(key)
+    return root
+
+
+def bst_delete(root, keys):
+    for key in keys:
+        if root is None:
+            break
+        root = root.delete(root, key)
+    return root
+
+
+def btree_build(keys):
+    tree = BPlusTree(btree_fanout)
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+
+def btree_delete(tree, keys):
+    for key in keys:
+        tree.delete(key)
+    return tree
+
+
+def inorder_count(root):
+    return sum(1 for _ in root.iter_inorder(root))
+
+
+# Для каждого движка: построение (оно же вставка), поиск, удаление, полный обход.
+# None - операция движком не поддерживается и не измеряется.
+ENGINES = {
+    "bst": (build_bst, lambda root, key: root.search(root, key), bst_delete, inorder_count),
+    "avl": (partial(build_tree, AVL_Node), lambda root, key: root.search(key), balanced_delete, inorder_count),
+    "rb": (partial(build_tree, RB_Node), lambda root, key: root.search(key), balanced_delete, inorder_count),
+    # Обход B+-дерева - по списку листьев
+    "btree": (btree_build, lambda tree, key: tree.search(key), btree_delete,
+              lambda tree: sum(1 for _ in tree)),
+}
+
+OPERATIONS = ["insert", "search_hit", "search_miss", "delete", "traversal"]
+
+
+def best_time(run, prepare=None, repeats=3):
+    """Лучшее время из repeats запусков run(prepare()); подготовка не измеряется"""
+    best = float("inf")
+    for _ in range(repeats):
+        arg = prepare() if prepare else None
+        start = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(engine, keys, rng, repeats=3):
+    """Время каждой операции на одном наборе ключей: ({операция: секунды}, {операция: число операций})"""
+    build, search, delete, traverse = ENGINES[engine]
+    unique = list(dict.fromkeys(keys))
+    hits = keys
+    misses = [key + 1 for key in keys]
+    delete_order = unique[:]
+    rng.shuffle(delete_order)
+
+    root = build(keys)
+
+    def search_all(queries):
+        for key in queries:
+            search(root, key)
+
+    times = {
+        "insert": best_time(lambda _: build(keys), repeats=repeats),
+        "search_hit": best_time(lambda _: search_all(hits), repeats=repeats),
+        "search_miss": best_time(lambda _: search_all(misses), repeats=repeats),
+        "traversal": best_time(lambda _: traverse(root), repeats=repeats),
+    }
+    if delete is not None:
+        times["delete"] = best_time(lambda tree: delete(tree, delete_order),
+                                    prepare=lambda: build(keys), repeats=repeats)
+    # Число операций для пересчета в оп/с
+    counts = {"insert": len(keys), "search_hit": len(hits), "search_miss": len(misses),
+              "traversal": len(unique), "delete": len(delete_order)}
+    return times, counts
+
+
+def run_suite(engines, distributions, sizes, repeats=3, seed=0, degenerate_limit=10 ** 4):
+    results = []
+    for n in sizes:
+        for distribution in distributions:
+            keys = DISTRIBUTIONS[distribution](n, random.Random(f"{seed}-{distribution}-{n}"))
+            for engine in engines:
+                if engine == "bst" and distribution in ORDERED_DISTRIBUTIONS and n > degenerate_limit:
+                    # Вырожденное BST: O(n^2) на построение, такие размеры не меряем
+                    continue
+                times, counts = measure(engine, keys, random.Random(seed), repeats)
+                for op in OPERATIONS:
+                    if op in times:
+                        results.append({
+                            "engine": engine,
+                            "distribution": distribution,
+                            "n": n,
+                            "op": op,
+                            "seconds": times[op],
+                            "ops_per_sec": counts[op] / times[op] if times[op] else None,
+                        })
+                print(f"   n = {n}, {distribution}, {engine}: "
+                      + ", ".join(f"{op} {times[op]:.3f} с" for op in OPERATIONS if op in times))
+    return results
+
+
+def result_key(result):
+    return result["engine"], result["distribution"], result["n"], result["op"]
+
+
+def compare(results, baseline, threshold, noise_floor=0.005):
+    """Замеры, которые медленнее базовых больше чем на threshold (доля):
+    список (замер, во сколько раз медленнее). Разница меньше noise_floor секунд
+    не считается - на коротких замерах это шум таймера и планировщика."""
+    base = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = base.get(result_key(result))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if ratio > 1 + threshold and result["seconds"] - old["seconds"] > noise_floor:
+            regressions.append((result, ratio))
+    return regressions
+
+
+def save_report(path, results, params):
+    report = {
+        "python": sys.version.split()[0],
+        "params": params,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+
+
+# Параметры эксперимента
+engines = ["bst", "avl", "rb", "btree"]
+distributions = ["random", "sorted", "reverse", "nearly-sorted", "zipf"]
+sizes = [1000, 10000, 100000]
+repeats = 3
+seed = 0
+# Обычное BST на упорядоченных ключах меряется только до этого размера
+degenerate_limit = 10000
+btree_fanout = 64
+results_path = "exp_ops.json"
+# Если файла базовой линии нет, текущие результаты сохраняются как базовые
+baseline_path = "exp_ops_baseline.json"
+regression_threshold = 0.2
+noise_floor = 0.005
+
+if __name__ == "__main__":
+    params = {"engines": engines, "distributions": distributions, "sizes": sizes,
+              "repeats": repeats, "seed": seed, "degenerate_limit": degenerate_limit,
+              "btree_fanout": btree_fanout}
+    results = run_suite(engines, distributions, sizes, repeats, seed, degenerate_limit)
+    save_report(results_path, results, params)
+    print(f"Результаты записаны в {results_path}")
+
+    if not os.path.exists(baseline_path):
+        save_report(baseline_path, results, params)
+        print(f"Базовой линии не было, результаты сохранены в {baseline_path}")
+    else:
+        with open(baseline_path) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, regression_threshold, noise_floor)
+        if regressions:
+            print(f"Замедления больше {regression_threshold:.0%} относительно {baseline_path}:")
+            for result, ratio in regressions:
+                print(f"   {result['engine']:<4} {result['distribution']:<14} n = {result['n']:<7} "
+                      f"{result['op']:<12} {ratio:.2f}x")
+        else:
+            print(f"Замедлений больше {regression_threshold:.0%} относительно {baseline_path} нет")
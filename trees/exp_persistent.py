@@ -0,0 +1,75 @@
+import random
+import time
+import tracemalloc
+from avl import AVL_Node
+from persistent_avl import PersistentAVL_Node
+
+
+def run_inserts(node_class, keys, snapshot_every=None):
+    """Вставка keys по одной; снимки берутся каждые snapshot_every вставок.
+    Для изменяемого AVL_Node снимок - полная копия дерева, для персистентного - ссылка на корень."""
+    snapshots = []
+    root = node_class(keys[0])
+    for i, key in enumerate(keys[1:], start=2):
+        root = root.insert(key)
+        if snapshot_every and i % snapshot_every == 0:
+            if node_class is PersistentAVL_Node:
+                snapshots.append(root)
+            else:
+                snapshots.append(AVL_Node.from_sorted(root.iter_inorder(root)))
+    return root, snapshots
+
+
+def run_deletes(root, keys):
+    for key in keys:
+        if root is None:
+            break
+        root = root.delete(key)
+    return root
+
+
+def measure(node_class, keys, snapshot_every):
+    start = time.perf_counter()
+    root, _ = run_inserts(node_class, keys)
+    insert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_deletes(root, keys[:len(keys) // 2])
+    delete_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    root, _ = run_inserts(node_class, keys)
+    tree_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del root
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    root, snapshots = run_inserts(node_class, keys, snapshot_every)
+    snapshot_time = time.perf_counter() - start
+    snapshot_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "insert_ops": len(keys) / insert_time,
+        "delete_ops": (len(keys) // 2) / delete_time,
+        "bytes_per_node": tree_bytes / len(keys),
+        "snapshots": len(snapshots),
+        "snapshot_time": snapshot_time,
+        "snapshot_mb": snapshot_bytes / 2 ** 20,
+    }
+
+
+# Параметры эксперимента
+n = 100000
+snapshot_every = 1000
+
+if __name__ == "__main__":
+    keys = random.sample(range(1, 100 * n), n)
+    for name, node_class in [("AVL_Node", AVL_Node), ("PersistentAVL_Node", PersistentAVL_Node)]:
+        result = measure(node_class, keys, snapshot_every)
+        print(f"{name}:")
+        print(f"   Вставка: {result['insert_ops']:.0f} оп/с, удаление: {result['delete_ops']:.0f} оп/с")
+        print(f"   Память дерева: {result['bytes_per_node']:.1f} байт/узел")
+        print(f"   {result['snapshots']} снимков: {result['snapshot_time']:.2f} с, "
+              f"{result['snapshot_mb']:.1f} МБ вместе с деревом")
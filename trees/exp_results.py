@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+
+def _normalized(params):
+    # Параметры сравниваются после круга через JSON: кортежи становятся списками
+    return json.loads(json.dumps(params))
+
+
+def _read_lines(path):
+    """(параметры, записи, длина целой части файла в байтах).
+    Оборванная последняя строка (прогон убит во время записи) отбрасывается."""
+    with open(path, "rb") as f:
+        data = f.read()
+    valid_length = data.rfind(b"\n") + 1
+    lines = data[:valid_length].decode().splitlines()
+    if not lines:
+        return None, [], 0
+    params = json.loads(lines[0])["params"]
+    records = [json.loads(line) for line in lines[1:]]
+    return params, records, valid_length
+
+
+def record_key(record):
+    # Записи отдельных экспериментов различаются еще и номером trial
+    return (record["trial"], record["n"]) if "trial" in record else record["n"]
+
+
+def read_results(path):
+    """Параметры и записи сохраненного прогона, записи отсортированы по n"""
+    params, records, _ = _read_lines(path)
+    return params, sorted(records, key=lambda record: record["n"])
+
+
+class ResultLog:
+    """Результаты эксперимента в файле JSON lines: первая строка - параметры
+    прогона, дальше по одной записи на каждое законченное n (или на пару
+    эксперимент trial и n, если в записи есть поле trial).
+
+    Запись сбрасывается на диск сразу, поэтому прерванный прогон с теми же
+    параметрами продолжается: done - уже посчитанные n или пары (trial, n). Если параметры
+    отличаются, смешивать результаты нельзя - нужен другой файл."""
+
+    def __init__(self, path, params):
+        self.path = path
+        self.done = {}
+        params = _normalized(params)
+
+        saved_params = None
+        if os.path.exists(path):
+            saved_params, records, valid_length = _read_lines(path)
+        if saved_params is None:
+            self._file = open(path, "w")
+            self._write({"params": params})
+            return
+
+        if saved_params != params:
+            raise ValueError(f"{path}: сохранен прогон с другими параметрами {saved_params}, "
+                             f"удалите файл или укажите другой")
+        self.done = {record_key(record): record for record in records}
+        os.truncate(path, valid_length)
+        self._file = open(path, "a")
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, record):
+        self._write(record)
+        self.done[record_key(record)] = record
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _job_records(job, item):
+    return list(job(item))
+
+
+def run_jobs(job, items, workers=1):
+    """Записи заданий по порядку items: для каждого item - итерируемое job(item).
+
+    job - генератор записей для одного задания (n или номер эксперимента),
+    зависящий только от item и параметров, поэтому результат не зависит от
+    числа процессов. При workers == 1 все считается в этом процессе и записи
+    идут по мере готовности; иначе задания считаются в пуле процессов, и
+    записи задания приходят вместе, когда оно закончено."""
+    if workers == 1:
+        for item in items:
+            yield job(item)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # По одному заданию за раз: задания крупные, а порядок результатов сохраняется
+        yield from executor.map(partial(_job_records, job), items)
+
+
+def command(default="all"):
+    """Шаг эксперимента из командной строки: compute - только расчет,
+    plot - только графики по сохраненным данным, all - оба шага"""
+    step = sys.argv[1] if len(sys.argv) > 1 else default
+    if step not in ("compute", "plot", "all"):
+        raise SystemExit(f"Использование: python {sys.argv[0]} [compute|plot|all]")
+    return step
@@ -0,0 +1,87 @@
+import random
+import time
+from itertools import accumulate
+from avl import AVL_Node
+from bst import build_tree
+from rb import RB_Node
+from wavl import WAVL_Node
+from splay import Splay_Node
+from tree_stats import collect
+
+ENGINES = [AVL_Node, RB_Node, WAVL_Node, Splay_Node]
+
+
+def access(root, key):
+    """Поиск key, возвращает корень после поиска: splay дерево меняет корень"""
+    found = root.search(key)
+    if type(root) is Splay_Node:
+        return found if found is not None else root.get_root()
+    return root
+
+
+def depth(root, key):
+    """Глубина узла key (в ребрах) обычным спуском, без перестройки дерева"""
+    node = root
+    result = 0
+    while key != node.key:
+        node = node.left if key < node.key else node.right
+        result += 1
+    return result
+
+
+def zipf_queries(keys, num_queries, s, rng):
+    """Запросы к ключам с частотами по закону Ципфа; самые частые ключи
+    выбираются случайно, а не среди наименьших"""
+    hot_order = keys[:]
+    rng.shuffle(hot_order)
+    cum_weights = list(accumulate(1 / rank ** s for rank in range(1, len(keys) + 1)))
+    return rng.choices(hot_order, cum_weights=cum_weights, k=num_queries)
+
+
+def average_depth(node_class, keys, queries):
+    root = build_tree(node_class, keys)
+    total = 0
+    for key in queries:
+        total += depth(root, key)
+        root = access(root, key)
+    return total / len(queries)
+
+
+def search_throughput(node_class, keys, queries):
+    root = build_tree(node_class, keys)
+    start = time.perf_counter()
+    for key in queries:
+        root = access(root, key)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def delete_rotations(node_class, keys, deletes):
+    """Среднее число поворотов на удаление"""
+    root = build_tree(node_class, keys)
+    with collect(node_class) as stats:
+        for key in deletes:
+            root = root.delete(key)
+    return stats.rotations / len(deletes)
+
+
+# Параметры эксперимента
+n = 100000
+num_queries = 200000
+zipf_exponents = [0.8, 1.0, 1.2]
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    keys = rng.sample(range(1, 10 * n), n)
+    for s in zipf_exponents:
+        queries = zipf_queries(keys, num_queries, s, rng)
+        print(f"Запросы по Ципфу, s = {s}, n = {n}, запросов {num_queries}")
+        for node_class in ENGINES:
+            print(f"   {node_class.__name__:<11} средняя глубина доступа: "
+                  f"{average_depth(node_class, keys, queries):6.2f}, "
+                  f"поиск: {search_throughput(node_class, keys, queries):8.0f} оп/с")
+
+    deletes = rng.sample(keys, n // 2)
+    print(f"Удаление {len(deletes)} случайных ключей:")
+    for node_class in ENGINES:
+        print(f"   {node_class.__name__:<11} поворотов на удаление: "
+              f"{delete_rotations(node_class, keys, deletes):.3f}")
@@ -0,0 +1,109 @@
+from avl import AVL_Node
+from rb import RB_Node
+
+
+class FingerTree:
+    """AVL или красно-черное дерево с пальцем - последним затронутым узлом.
+
+    Вставка и поиск начинаются не с корня, а с пальца: подъем идет только до
+    предка, в поддереве которого лежит ключ. Для ключей больше максимума и
+    меньше минимума место вставки известно сразу. Поэтому на отсортированных
+    и локально сгруппированных ключах поиск места стоит O(1) амортизированно.
+    Корень отслеживается здесь же, без get_root() после каждой вставки.
+
+    Поддерживаются узлы без дополнительных полей: AVL_Node и RB_Node."""
+
+    def __init__(self, node_class=RB_Node):
+        if node_class not in (AVL_Node, RB_Node):
+            raise ValueError("Поддерживаются только AVL_Node и RB_Node")
+        self.node_class = node_class
+        self.root = None
+        self.finger = None
+        self._min = None
+        self._max = None
+
+    def _climb(self, key):
+        """Ближайший к пальцу предок, в поддереве которого лежит место для key.
+        Поддерево node ограничено с одной стороны ключом пальца, а с другой -
+        ключом родителя, если node - его ребенок с той стороны, куда смотрит key."""
+        node = self.finger
+        if key == node.key:
+            return node
+        key_greater = key > node.key
+        while node.parent is not None:
+            parent = node.parent
+            if key == parent.key:
+                return parent
+            if key_greater and node is parent.left and key < parent.key:
+                return node
+            if not key_greater and node is parent.right and key > parent.key:
+                return node
+            node = parent
+        return node
+
+    @staticmethod
+    def _descend(node, key):
+        """Обычный спуск: (узел с ключом или None, последний пройденный узел)"""
+        while True:
+            if key == node.key:
+                return node, node
+            child = node.left if key < node.key else node.right
+            if child is None:
+                return None, node
+            node = child
+
+    def _new_node(self, key, parent):
+        if self.node_class is RB_Node:
+            color = RB_Node.BLACK if parent is None else RB_Node.RED
+            return RB_Node(key, parent, color)
+        return AVL_Node(key, parent)
+
+    def _rebalance(self, node):
+        if self.node_class is RB_Node:
+            node._fix_red_loop()
+        else:
+            node._retrace_insert()
+        # Корень меняется только при повороте в корне: новый корень - его родитель
+        while self.root.parent is not None:
+            self.root = self.root.parent
+        if self.node_class is RB_Node:
+            self.root.color = RB_Node.BLACK
+
+    def insert(self, key):
+        """Вставка ключа, возвращает узел с этим ключом"""
+        if self.root is None:
+            self.root = self._new_node(key, None)
+            self.finger = self._min = self._max = self.root
+            return self.root
+
+        if key > self._max.key:
+            parent = self._max
+        elif key < self._min.key:
+            parent = self._min
+        else:
+            found, parent = self._descend(self._climb(key), key)
+            if found is not None:
+                self.finger = found
+                return found
+
+        node = self._new_node(key, parent)
+        if key < parent.key:
+            parent.left = node
+        else:
+            parent.right = node
+        if key > self._max.key:
+            self._max = node
+        elif key < self._min.key:
+            self._min = node
+
+        self._rebalance(node)
+        self.finger = node
+        return node
+
+    def search(self, key):
+        """Поиск ключа от пальца; палец переходит на последний пройденный узел"""
+        if self.root is None:
+            return None
+        found, last = self._descend(self._climb(key), key)
+        self.finger = last
+        return found
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def _heap_ranks(index, height, last_level):
+    """Места в отсортированном порядке для узлов неявного дерева с номерами index
+    (нумерация кучи с 1, высота height, на нижнем уровне last_level узлов)"""
+    depth = np.frexp(index.astype(np.float64))[1].astype(np.int64) - 1
+    offset = index - (np.int64(1) << depth)
+    position = ((2 * offset + 1) << (height - depth)) - 1
+    return position - np.maximum(0, (position + 1) // 2 - last_level)
+
+
+class FrozenTree:
+    """Неизменяемый снимок дерева: ключи в массиве numpy в порядке Эйтцингера
+    (BFS порядок полного дерева, корень в ячейке 1, дети ячейки k - 2k и 2k + 1).
+
+    Пакетный поиск идет одновременно по всем запросам: на каждом уровне
+    один векторный шаг k = 2k + (keys[k] < q), без ветвлений по запросам.
+    Верхние уровни лежат в начале массива и остаются в кэше."""
+
+    def __init__(self, sorted_keys):
+        sorted_keys = np.asarray(sorted_keys)
+        n = len(sorted_keys)
+        self.size = n
+        # Число уровней; дополнение до 2^levels ячеек нужно, чтобы последний шаг не вышел за массив
+        self.levels = n.bit_length()
+        self._height = height = max(self.levels - 1, 0)
+        self._last_level = n - ((1 << height) - 1)
+        keys = np.empty(max(1 << self.levels, 2), dtype=sorted_keys.dtype)
+        if n:
+            # Ячейка 0 и хвост после size не используются, но заполняются ключом
+            keys[0] = keys[n + 1:] = sorted_keys[-1]
+        # По уровню за шаг, чтобы временные массивы были не больше n / 2
+        for depth in range(self.levels):
+            start = 1 << depth
+            index = np.arange(start, min(2 * start, n + 1), dtype=np.int64)
+            keys[index] = sorted_keys[_heap_ranks(index, height, self._last_level)]
+        keys.setflags(write=False)
+        self.keys = keys
+
+    def __len__(self):
+        return self.size
+
+    def _descend(self, queries):
+        """Номер (по Эйтцингеру) первого узла с ключом >= q для каждого запроса, 0 если такого нет"""
+        keys = self.keys
+        k = np.ones(len(queries), dtype=np.int64)
+        if self.size == 0:
+            return k - 1
+        for _ in range(self.levels - 1):
+            k = 2 * k + (keys[k] < queries)
+        # На нижнем уровне ячейки после size пустые: через них спуск уходит вправо
+        k = 2 * k + ((keys[k] < queries) | (k > self.size))
+        # Отбрасываем хвост поворотов направо и последний поворот налево
+        return k // (((~k) & (k + 1)) << 1)
+
+    def contains(self, queries):
+        """Массив bool: есть ли каждый ключ из queries в снимке"""
+        queries = np.asarray(queries)
+        k = self._descend(queries)
+        return (k != 0) & (self.keys[k] == queries)
+
+    def lower_bound(self, queries):
+        """Для каждого запроса - число ключей меньше него, как np.searchsorted(..., side="left")"""
+        queries = np.asarray(queries)
+        k = self._descend(queries)
+        ranks = np.full(len(queries), self.size, dtype=np.int64)
+        found = k != 0
+        ranks[found] = _heap_ranks(k[found], self._height, self._last_level)
+        return ranks
+
+    def __contains__(self, key):
+        return bool(self.contains(np.array([key]))[0])
+
+    def inorder(self):
+        """Ключи по возрастанию"""
+        order = np.empty(self.size, dtype=np.int64)
+        order[_heap_ranks(np.arange(1, self.size + 1, dtype=np.int64), self._height,
+                          self._last_level)] = np.arange(1, self.size + 1)
+        return self.keys[order]
@@ -0,0 +1,119 @@
+from bst import Node
+
+
+class PersistentAVL_Node(Node):
+    """Персистентное AVL дерево: insert и delete не меняют существующие узлы,
+    а возвращают новый корень. Новыми создаются только узлы на пути поиска
+    (O(log n) штук), остальные поддеревья общие со старой версией, поэтому
+    снимок дерева - это просто сохраненная ссылка на корень.
+
+    parent не используется: узел может входить сразу в несколько версий."""
+    __slots__ = ("height",)
+    # Высоты в файл BST не пишутся
+    _FILE_KIND = None
+
+    def __init__(self, key, parent=None):
+        super().__init__(key, parent)
+        self.height = 1
+
+    @classmethod
+    def _make(cls, key, left, right):
+        node = cls(key)
+        node.left = left
+        node.right = right
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        node.height = max(left_height, right_height) + 1
+        return node
+
+    @classmethod
+    def _balanced(cls, key, left, right):
+        """Новый узел key над left и right; повороты тоже создают копии узлов"""
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+
+        # Left Heavy
+        if left_height > right_height + 1:
+            inner = left.right
+            if (left.left.height if left.left else 0) >= (inner.height if inner else 0):
+                # Left-Left case
+                return cls._make(left.key, left.left, cls._make(key, inner, right))
+            # Left-Right case
+            return cls._make(inner.key,
+                             cls._make(left.key, left.left, inner.left),
+                             cls._make(key, inner.right, right))
+
+        # Right Heavy
+        if right_height > left_height + 1:
+            inner = right.left
+            if (right.right.height if right.right else 0) >= (inner.height if inner else 0):
+                # Right-Right case
+                return cls._make(right.key, cls._make(key, left, inner), right.right)
+            # Right-Left case
+            return cls._make(inner.key,
+                             cls._make(key, left, inner.left),
+                             cls._make(right.key, inner.right, right.right))
+
+        return cls._make(key, left, right)
+
+    def insert(self, key):
+        """Новая версия дерева с ключом key"""
+        cls = type(self)
+
+        def _insert(node):
+            if node is None:
+                return cls(key)
+            if key < node.key:
+                left = _insert(node.left)
+                if left is node.left:
+                    return node
+                return cls._balanced(node.key, left, node.right)
+            if key > node.key:
+                right = _insert(node.right)
+                if right is node.right:
+                    return node
+                return cls._balanced(node.key, node.left, right)
+            # Ключ уже есть - версия не меняется
+            return node
+
+        return _insert(self)
+
+    def delete(self, key):
+        """Новая версия дерева без ключа key (None, если дерево стало пустым)"""
+        cls = type(self)
+
+        def _delete_min(node):
+            # Возвращает (поддерево без минимума, минимальный ключ)
+            if node.left is None:
+                return node.right, node.key
+            left, min_key = _delete_min(node.left)
+            return cls._balanced(node.key, left, node.right), min_key
+
+        def _delete(node):
+            if node is None:
+                return None
+            if key < node.key:
+                left = _delete(node.left)
+                if left is node.left:
+                    return node
+                return cls._balanced(node.key, left, node.right)
+            if key > node.key:
+                right = _delete(node.right)
+                if right is node.right:
+                    return node
+                return cls._balanced(node.key, node.left, right)
+            # Нашли узел для удаления
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            right, successor_key = _delete_min(node.right)
+            return cls._balanced(successor_key, node.left, right)
+
+        return _delete(self)
+
+    def search(self, key):
+        node = self
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+        return node
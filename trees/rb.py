@@ -1,14 +1,51 @@
-from bst import Node
+import os
+import random
+import tempfile
+import tree_check
+import tree_io
+from bst import JoinOperations, Node, OrderStatistics, SelfRooted, sorted_unique_keys
 
 
-class RB_Node(Node):
-    RED = "RED"
-    BLACK = "BLACK"
+class RB_Node(SelfRooted, JoinOperations, Node):
+    __slots__ = ("color",)
+    _FILE_KIND = tree_io.KIND_RB
+    # Счетчики tree_stats.TreeStats, включаются через tree_stats.collect
+    _stats = None
+
+    # Цвет хранится одним битом: True - красный, False - черный
+    RED = True
+    BLACK = False
 
     def __init__(self, key, parent=None, color=RED):
         super().__init__(key, parent)
         self.color = color
 
+    @classmethod
+    def from_sorted(cls, iterable):
+        """Построение красно-черного дерева за O(n), возвращает корень"""
+        keys = sorted_unique_keys(iterable)
+        n = len(keys)
+        # Деление пополам дает дерево, где все NIL лежат на двух соседних уровнях.
+        # Узлы нижнего неполного уровня красятся в красный, остальные - в черный.
+        red_depth = n.bit_length() - 1 if (n + 1) & n else -1
+
+        def build(lo, hi, parent, depth):
+            if lo > hi:
+                return None
+            mid = (lo + hi) // 2
+            color = RB_Node.RED if depth == red_depth else RB_Node.BLACK
+            node = cls(keys[mid], parent, color)
+            node.left = build(lo, mid - 1, node, depth + 1)
+            node.right = build(mid + 1, hi, node, depth + 1)
+            node.update_augmentation()
+            return node
+
+        return build(0, n - 1, None, 0)
+
+    def update_augmentation(self):
+        """Пересчет дополнительных полей узла по детям (у наследников)"""
+        pass
+
     def get_root(self):
         """Получить корень дерева"""
         node = self
@@ -17,33 +54,20 @@ class RB_Node(Node):
         return node
 
     def black_height(self, node=None):
-        """Вычисляет черную высоту поддерева"""
-        if node is None:
-            node = self
-
-        if node is None:
-            return 1  # NIL узлы считаются черными
-
-        left_bh = self.black_height(node.left) if node.left else 0
-        right_bh = self.black_height(node.right) if node.right else 0
-
-        if left_bh != right_bh:
-            return -1  # Ошибка балансировки
-
-        # Увеличиваем черную высоту, если текущий узел черный
-        return left_bh + (1 if node.color == RB_Node.BLACK else 0)
+        """Вычисляет черную высоту поддерева (-1, если она различается на разных путях)"""
+        return tree_check.black_height(self if node is None else node)
 
     def insert(self, key):
         """Вставка ключа в дерево"""
         if key < self.key:
             if self.left is None:
-                self.left = RB_Node(key, self, RB_Node.RED)
+                self.left = type(self)(key, self, RB_Node.RED)
                 return self.left.fix_insertion()
             else:
                 return self.left.insert(key)
         elif key > self.key:
             if self.right is None:
-                self.right = RB_Node(key, self, RB_Node.RED)
+                self.right = type(self)(key, self, RB_Node.RED)
                 return self.right.fix_insertion()
             else:
                 return self.right.insert(key)
@@ -52,9 +76,28 @@ class RB_Node(Node):
 
     def fix_insertion(self):
         """Исправление свойств красно-черного дерева после вставки"""
+        # Корень всегда черный
+        root = self._fix_red_parent()
+        if root.color == RB_Node.RED and self._stats is not None:
+            self._stats.recolors += 1
+        root.color = RB_Node.BLACK
+        return root
+
+    def _fix_red_parent(self):
+        """Устранение пары красный-красный над красным узлом self.
+        Корень может остаться красным, возвращает корень."""
+        self._fix_red_loop()
+        return self.get_root()
+
+    def _fix_red_loop(self):
+        """Цикл перекрашиваний и поворотов без поиска корня.
+        Если повернут корень, новый корень - родитель старого."""
         node = self
+        stats = self._stats
 
         while node.parent is not None and node.parent.color == RB_Node.RED:
+            if stats is not None:
+                stats.fixup_iterations += 1
             parent = node.parent
             grandparent = parent.parent
 
@@ -66,6 +109,8 @@ class RB_Node(Node):
 
                 # Случай 1: дядя красный
                 if uncle is not None and uncle.color == RB_Node.RED:
+                    if stats is not None:
+                        stats.recolors += 3
                     parent.color = RB_Node.BLACK
                     uncle.color = RB_Node.BLACK
                     grandparent.color = RB_Node.RED
@@ -79,6 +124,8 @@ class RB_Node(Node):
                         grandparent = parent.parent if parent else None
 
                     # Случай 3: узел - левый потомок
+                    if stats is not None:
+                        stats.recolors += 2
                     if parent:
                         parent.color = RB_Node.BLACK
                     if grandparent:
@@ -90,6 +137,8 @@ class RB_Node(Node):
 
                 # Случай 1: дядя красный
                 if uncle is not None and uncle.color == RB_Node.RED:
+                    if stats is not None:
+                        stats.recolors += 3
                     parent.color = RB_Node.BLACK
                     uncle.color = RB_Node.BLACK
                     grandparent.color = RB_Node.RED
@@ -103,22 +152,21 @@ class RB_Node(Node):
                         grandparent = parent.parent if parent else None
 
                     # Случай 3: узел - правый потомок
+                    if stats is not None:
+                        stats.recolors += 2
                     if parent:
                         parent.color = RB_Node.BLACK
                     if grandparent:
                         grandparent.color = RB_Node.RED
                         self._left_rotate(grandparent)
 
-        # Корень всегда черный
-        root = self.get_root()
-        root.color = RB_Node.BLACK
-        return root
-
     def _left_rotate(self, x):
         """Левый поворот вокруг узла x"""
         y = x.right
         if y is None:
             return
+        if self._stats is not None:
+            self._stats.rotations += 1
 
         # Поворот
         x.right = y.left
@@ -143,6 +191,8 @@ class RB_Node(Node):
         x = y.left
         if x is None:
             return
+        if self._stats is not None:
+            self._stats.rotations += 1
 
         # Поворот
         y.left = x.right
@@ -167,6 +217,8 @@ class RB_Node(Node):
         pivot = self.right
         if pivot is None:
             return self
+        if self._stats is not None:
+            self._stats.rotations += 1
 
         # Сохраняем родителя
         parent = self.parent
@@ -194,6 +246,8 @@ class RB_Node(Node):
         pivot = self.left
         if pivot is None:
             return self
+        if self._stats is not None:
+            self._stats.rotations += 1
 
         # Сохраняем родителя
         parent = self.parent
@@ -218,13 +272,210 @@ class RB_Node(Node):
 
     def search(self, key):
         """Поиск ключа в дереве"""
-        if key == self.key:
-            return self
-        elif key < self.key and self.left:
-            return self.left.search(key)
-        elif key > self.key and self.right:
-            return self.right.search(key)
-        return None
+        node = self
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+        return node
+
+    def delete(self, key):
+        """Удаление ключа из дерева с корнем self.
+        Возвращает новый корень (None, если дерево опустело)."""
+        node = self
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+        if node is None:
+            return self.get_root()
+
+        # У узла с двумя детьми забираем ключ преемника и удаляем преемника
+        if node.left is not None and node.right is not None:
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            node.key = successor.key
+            node = successor
+
+        # Теперь у node не больше одного ребенка - вырезаем его
+        child = node.left if node.left is not None else node.right
+        parent = node.parent
+        if child is not None:
+            child.parent = parent
+        if parent is None:
+            if child is None:
+                return None
+            child.color = RB_Node.BLACK
+            return child
+        if parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+        node.parent = None
+        self._after_remove(parent)
+
+        if node.color == RB_Node.BLACK:
+            if child is not None and child.color == RB_Node.RED:
+                child.color = RB_Node.BLACK
+            else:
+                self._fix_double_black(child, parent)
+
+        while parent.parent is not None:
+            parent = parent.parent
+        return parent
+
+    def _after_remove(self, parent):
+        """Хук для наследников: из поддерева parent только что вырезан узел"""
+
+    @staticmethod
+    def _is_red(node):
+        return node is not None and node.color == RB_Node.RED
+
+    def _fix_double_black(self, node, parent):
+        """Восстановление черной высоты после удаления черного узла.
+        На пути через node (может быть None) не хватает одного черного узла."""
+        is_red = RB_Node._is_red
+
+        while parent is not None and not is_red(node):
+            # node может быть None, но тогда брат обязательно есть с другой стороны
+            if node is parent.left:
+                sibling = parent.right
+
+                # Случай 1: брат красный - поворотом сводим к черному брату
+                if sibling.color == RB_Node.RED:
+                    sibling.color = RB_Node.BLACK
+                    parent.color = RB_Node.RED
+                    self._left_rotate(parent)
+                    sibling = parent.right
+
+                # Случай 2: оба ребенка брата черные - перекрашиваем брата, поднимаемся
+                if not is_red(sibling.left) and not is_red(sibling.right):
+                    sibling.color = RB_Node.RED
+                    node = parent
+                    parent = node.parent
+                    continue
+
+                # Случай 3: дальний ребенок брата черный - поворачиваем брата
+                if not is_red(sibling.right):
+                    sibling.left.color = RB_Node.BLACK
+                    sibling.color = RB_Node.RED
+                    self._right_rotate(sibling)
+                    sibling = parent.right
+
+                # Случай 4: дальний ребенок брата красный - поворот вокруг родителя
+                sibling.color = parent.color
+                parent.color = RB_Node.BLACK
+                sibling.right.color = RB_Node.BLACK
+                self._left_rotate(parent)
+                return
+            else:
+                # Симметричный случай: node - правый потомок
+                sibling = parent.left
+
+                if sibling.color == RB_Node.RED:
+                    sibling.color = RB_Node.BLACK
+                    parent.color = RB_Node.RED
+                    self._right_rotate(parent)
+                    sibling = parent.left
+
+                if not is_red(sibling.left) and not is_red(sibling.right):
+                    sibling.color = RB_Node.RED
+                    node = parent
+                    parent = node.parent
+                    continue
+
+                if not is_red(sibling.left):
+                    sibling.right.color = RB_Node.BLACK
+                    sibling.color = RB_Node.RED
+                    self._left_rotate(sibling)
+                    sibling = parent.left
+
+                sibling.color = parent.color
+                parent.color = RB_Node.BLACK
+                sibling.left.color = RB_Node.BLACK
+                self._right_rotate(parent)
+                return
+
+        # Красный node (или корень) забирает недостающий черный цвет себе
+        if node is not None:
+            node.color = RB_Node.BLACK
+
+    # Ранг красно-черного дерева для JoinOperations - черная высота корня
+    @staticmethod
+    def _rank(root):
+        rank = 0
+        node = root
+        while node is not None:
+            if node.color == RB_Node.BLACK:
+                rank += 1
+            node = node.left
+        return rank
+
+    @staticmethod
+    def _child_rank(node, rank, child):
+        return rank - (1 if node.color == RB_Node.BLACK else 0)
+
+    @classmethod
+    def _finish(cls, root):
+        if root is not None:
+            root.parent = None
+            root.color = RB_Node.BLACK
+        return root
+
+    @classmethod
+    def _join(cls, left, left_rank, key, right, right_rank):
+        # Красный корень перекрашиваем: черная высота дерева растет на 1
+        if left is not None and left.color == RB_Node.RED:
+            left.color = RB_Node.BLACK
+            left_rank += 1
+        if right is not None and right.color == RB_Node.RED:
+            right.color = RB_Node.BLACK
+            right_rank += 1
+
+        if left_rank == right_rank:
+            root = cls(key, None, RB_Node.BLACK)
+            root.left = left
+            root.right = right
+            if left:
+                left.parent = root
+            if right:
+                right.parent = root
+            root.update_augmentation()
+            return root, left_rank + 1
+
+        # Спускаемся по краю более высокого дерева до черного узла с черной высотой
+        # меньшего дерева и подвешиваем на его место красный узел key
+        taller_left = left_rank > right_rank
+        rank = left_rank if taller_left else right_rank
+        target_rank = right_rank if taller_left else left_rank
+        parent = None
+        node = left if taller_left else right
+        while not (rank == target_rank and (node is None or node.color == RB_Node.BLACK)):
+            if node.color == RB_Node.BLACK:
+                rank -= 1
+            parent = node
+            node = node.right if taller_left else node.left
+
+        joint = cls(key, parent, RB_Node.RED)
+        if taller_left:
+            joint.left, joint.right = node, right
+            parent.right = joint
+        else:
+            joint.left, joint.right = left, node
+            parent.left = joint
+        if joint.left:
+            joint.left.parent = joint
+        if joint.right:
+            joint.right.parent = joint
+
+        ancestor = joint
+        while ancestor is not None:
+            ancestor.update_augmentation()
+            ancestor = ancestor.parent
+        # Поля наследников уже пересчитаны выше, поэтому не fix_insertion
+        root = joint._fix_red_parent()
+        rank = max(left_rank, right_rank)
+        if root.color == RB_Node.RED:
+            root.color = RB_Node.BLACK
+            rank += 1
+        return root, rank
 
     def print_tree_visual(self, level=0, prefix="Root: "):
         """Визуализация дерева"""
@@ -243,45 +494,136 @@ class RB_Node(Node):
             self.left.print_tree_visual(level + 1, "└── ")
 
     def validate_rb_tree(self):
-        """Проверка свойств красно-черного дерева"""
-        violations = []
+        """Проверка свойств красно-черного дерева, порядка ключей и ссылок parent"""
+        return tree_check.validate(self.get_root())
+
+
+class RB_HeightNode(RB_Node):
+    """Красно-черное дерево, где узел хранит высоту своего поддерева.
+    Высота всего дерева читается из корня за O(1)."""
+    __slots__ = ("height",)
+    # Высоты поддеревьев в файл не пишутся
+    _FILE_KIND = None
+
+    def __init__(self, key, parent=None, color=RB_Node.RED):
+        super().__init__(key, parent, color)
+        self.height = 1
+
+    def update_height(self):
+        left_height = self.left.height if self.left else 0
+        right_height = self.right.height if self.right else 0
+        self.height = max(left_height, right_height) + 1
+
+    def update_augmentation(self):
+        self.update_height()
+
+    @staticmethod
+    def _update_heights_upward(node):
+        """Пересчет высот от node к корню, пока они меняются"""
+        while node is not None:
+            old_height = node.height
+            node.update_height()
+            if node.height == old_height:
+                break
+            node = node.parent
 
-        def _validate(node):
-            if node is None:
-                return 1, True  # Черная высота, валидно
+    def fix_insertion(self):
+        # Новый лист удлиняет путь до корня, повороты ниже поправят свои узлы
+        self._update_heights_upward(self.parent)
+        return super().fix_insertion()
 
-            # Проверяем свойство красного узла
-            if node.color == RB_Node.RED:
-                if (node.left and node.left.color == RB_Node.RED) or \
-                        (node.right and node.right.color == RB_Node.RED):
-                    return 0, False
+    def _after_remove(self, parent):
+        self._update_heights_upward(parent)
 
-            # Рекурсивно проверяем детей
-            left_bh, left_valid = _validate(node.left)
-            right_bh, right_valid = _validate(node.right)
+    def _after_rotate(self, child, new_top):
+        child.update_height()
+        new_top.update_height()
+        self._update_heights_upward(new_top.parent)
 
-            if not left_valid or not right_valid:
-                return 0, False
+    def _left_rotate(self, x):
+        y = x.right
+        super()._left_rotate(x)
+        if y is not None:
+            self._after_rotate(x, y)
+
+    def _right_rotate(self, y):
+        x = y.left
+        super()._right_rotate(y)
+        if x is not None:
+            self._after_rotate(y, x)
+
+    def left_rotate(self):
+        pivot = super().left_rotate()
+        if pivot is not self:
+            self._after_rotate(self, pivot)
+        return pivot
+
+    def right_rotate(self):
+        pivot = super().right_rotate()
+        if pivot is not self:
+            self._after_rotate(self, pivot)
+        return pivot
 
-            # Проверяем черную высоту
-            if left_bh != right_bh:
-                return 0, False
 
-            # Возвращаем черную высоту этого поддерева
-            current_bh = left_bh + (1 if node.color == RB_Node.BLACK else 0)
-            return current_bh, True
+class RB_SizeNode(OrderStatistics, RB_Node):
+    """Красно-черное дерево с размерами поддеревьев: select, rank и count_range за O(log n)"""
+    __slots__ = ("size",)
+    # Размеры поддеревьев в файл не пишутся
+    _FILE_KIND = None
 
-        # Проверка 1: корень должен быть черным
-        root = self.get_root()
-        if root.color != RB_Node.BLACK:
-            violations.append("Корень не черный")
+    def __init__(self, key, parent=None, color=RB_Node.RED):
+        super().__init__(key, parent, color)
+        self.size = 1
 
-        # Проверка 2: все свойства RB-дерева
-        _, is_valid = _validate(root)
-        if not is_valid:
-            violations.append("Нарушены свойства красно-черного дерева")
+    def update_size(self):
+        left_size = self.left.size if self.left else 0
+        right_size = self.right.size if self.right else 0
+        self.size = left_size + right_size + 1
 
-        return violations
+    def update_augmentation(self):
+        self.update_size()
+
+    def fix_insertion(self):
+        # Новый лист увеличивает размер всех предков, повороты дальше поправят свои узлы
+        node = self.parent
+        while node is not None:
+            node.size += 1
+            node = node.parent
+        return super().fix_insertion()
+
+    def _after_remove(self, parent):
+        # Узел вырезан - размер всех предков уменьшается, повороты дальше поправят свои узлы
+        while parent is not None:
+            parent.size -= 1
+            parent = parent.parent
+
+    def _left_rotate(self, x):
+        y = x.right
+        super()._left_rotate(x)
+        if y is not None:
+            x.update_size()
+            y.update_size()
+
+    def _right_rotate(self, y):
+        x = y.left
+        super()._right_rotate(y)
+        if x is not None:
+            y.update_size()
+            x.update_size()
+
+    def left_rotate(self):
+        pivot = super().left_rotate()
+        if pivot is not self:
+            self.update_size()
+            pivot.update_size()
+        return pivot
+
+    def right_rotate(self):
+        pivot = super().right_rotate()
+        if pivot is not self:
+            self.update_size()
+            pivot.update_size()
+        return pivot
 
 
 def test_rb():
@@ -299,18 +641,22 @@ def test_rb():
     # Вставляем элементы
     keys_to_insert = [5, 15, 3, 7, 12, 18, 2, 4, 6, 8, 11, 14, 17, 20]
 
+    # После каждой вставки проверяется только путь к новому ключу
+    validator = tree_check.PathValidator()
     for key in keys_to_insert:
         print(f"   Вставляем {key}...", end="")
         root = root.insert(key)
         root = root.get_root()
-        violations = root.validate_rb_tree()
+        validator.touch(key)
+        violations = validator.check(root)
         if not violations:
             print(" ✓")
         else:
             print(" ✗")
             print(f"     Ошибки: {violations}")
 
-    print(f"\n2. Корень дерева: {root.key} (цвет: {root.color})")
+    root_color = 'красный' if root.color == RB_Node.RED else 'черный'
+    print(f"\n2. Корень дерева: {root.key} (цвет: {root_color})")
 
     print("\n3. Визуализация дерева:")
     root.print_tree_visual()
@@ -338,16 +684,7 @@ def test_rb():
 
     print("\n7. Проверка сортировки (inorder traversal):")
 
-    def inorder(node, result=None):
-        if result is None:
-            result = []
-        if node:
-            inorder(node.left, result)
-            result.append(node.key)
-            inorder(node.right, result)
-        return result
-
-    sorted_keys = inorder(root)
+    sorted_keys = list(root.iter_inorder(root))
     print(f"   Отсортированные ключи: {sorted_keys}")
 
     is_sorted = all(sorted_keys[i] <= sorted_keys[i + 1] for i in range(len(sorted_keys) - 1))
@@ -356,6 +693,106 @@ def test_rb():
     else:
         print("   ✗ Нарушена сортировка")
 
+    print("\n8. Построение из отсортированных ключей:")
+    bulk_root = RB_Node.from_sorted(range(1, 101))
+    violations = bulk_root.validate_rb_tree()
+    if not violations and bulk_root.inorder(bulk_root) == list(range(1, 101)):
+        print(f"   ✓ Корень {bulk_root.key}, свойства красно-черного дерева выполнены")
+    else:
+        print(f"   ✗ Ошибки: {violations}")
+
+    print("\n9. Порядковые статистики:")
+    stat_root = RB_SizeNode(10, color=RB_Node.BLACK)
+    for key in keys_to_insert:
+        stat_root = stat_root.insert(key)
+    print(f"   select(0) = {stat_root.select(0)}, select(7) = {stat_root.select(7)}, "
+          f"rank(12) = {stat_root.rank(12)}, count_range(5, 15) = {stat_root.count_range(5, 15)}")
+    if [stat_root.select(i) for i in range(stat_root.size)] == sorted_keys:
+        print("   ✓ select согласован с inorder")
+
+    print("\n10. Разрезание и объединение:")
+    less, found, greater = RB_Node.from_sorted(range(1, 21)).split(10)
+    print(f"   split(10): {less.inorder(less)} | найден: {found} | {greater.inorder(greater)}")
+    common = RB_Node.intersection(RB_Node.from_sorted(range(0, 30, 2)), RB_Node.from_sorted(range(0, 30, 3)))
+    print(f"   intersection: {common.inorder(common)}")
+    if not less.validate_rb_tree() and not greater.validate_rb_tree() and not common.validate_rb_tree():
+        print("   ✓ Свойства красно-черного дерева выполнены")
+
+    print("\n11. Удаление:")
+    del_root = RB_Node.from_sorted(range(1, 21))
+    for key in [10, 1, 20, 15, 5, 100]:
+        del_root = del_root.delete(key)
+    print(f"   После удаления 10, 1, 20, 15, 5 и отсутствующего 100: {del_root.inorder(del_root)}")
+    if not del_root.validate_rb_tree():
+        print(f"   ✓ Свойства красно-черного дерева выполнены, корень {del_root.key}")
+    else:
+        print(f"   ✗ Ошибки: {del_root.validate_rb_tree()}")
+
+    print("\n12. Пакетный поиск:")
+    batch = [17, 100, 2, 11, 100]
+    found = root.search_many(batch)
+    print(f"   search_many({batch}): {[node.key if node else None for node in found]}")
+    if found == [root.search(key) for key in batch]:
+        print("   ✓ Совпадает с поиском по одному ключу")
+
+    print("\n13. Неизменяемый снимок:")
+    frozen = root.freeze()
+    print(f"   contains({batch}): {frozen.contains(batch).tolist()}")
+    print(f"   lower_bound({batch}): {frozen.lower_bound(batch).tolist()}")
+    if frozen.inorder().tolist() == sorted_keys:
+        print("   ✓ Ключи снимка совпадают с inorder")
+
+    print("\n14. Сохранение в файл:")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rb.tree")
+        del_root.dump(path)
+        loaded = RB_Node.load(path)
+    print(f"   dump/load: {loaded.inorder(loaded)}")
+    # Цвета читаются из файла (1 бит на узел)
+    saved = [(node.key, node.color) for node in tree_io.preorder_nodes(del_root)]
+    restored = [(node.key, node.color) for node in tree_io.preorder_nodes(loaded)]
+    if saved == restored and not tree_check.validate(loaded):
+        print("   ✓ Форма и цвета узлов совпадают, свойства красно-черного дерева выполнены")
+    else:
+        print(f"   ✗ Форма или цвета узлов изменились: {tree_check.validate(loaded)}")
+
+    print("\n15. Случайные вставки и удаления:")
+    # Ключи из узкого диапазона, чтобы удаления часто попадали в дерево
+    rng = random.Random(2024)
+    stream_root = None
+    expected = set()
+    validator = tree_check.PathValidator(full_every=50)
+    errors = []
+    operations = 4000
+    deleted = 0
+    for step in range(operations):
+        key = rng.randrange(500)
+        if rng.random() < 0.5:
+            if stream_root is None:
+                stream_root = RB_Node(key, color=RB_Node.BLACK)
+            else:
+                stream_root = stream_root.insert(key)
+            expected.add(key)
+        elif stream_root is not None:
+            deleted += key in expected
+            stream_root = stream_root.delete(key)
+            expected.discard(key)
+        validator.touch(key)
+        errors.extend(validator.check(stream_root))
+        if step % 500 == 0 and stream_root is not None and \
+                stream_root.inorder(stream_root) != sorted(expected):
+            errors.append(f"Шаг {step}: ключи дерева расходятся с множеством")
+    final_keys = stream_root.inorder(stream_root) if stream_root is not None else []
+    if final_keys != sorted(expected):
+        errors.append("В конце ключи дерева расходятся с множеством")
+    errors.extend(tree_check.validate(stream_root))
+    print(f"   {operations} операций, из них {deleted} удалений существующих ключей, "
+          f"в дереве {len(expected)} ключей, полных проверок {validator.full_checks}")
+    if not errors:
+        print("   ✓ После каждой операции свойства выполнены, ключи совпадают с set")
+    else:
+        print(f"   ✗ Ошибки ({len(errors)}): {errors[:5]}")
+
     return root
 
 
@@ -21,6 +21,12 @@ def run_all_tests():
     except ImportError:
         print("\nФайл rb_tree.py не найден, тест RB пропущен")
 
+    from wavl import test_wavl
+    wavl_root = test_wavl()
+
+    from splay import test_splay
+    splay_root = test_splay()
+
     print("\n" + "=" * 60)
     print("ТЕСТИРОВАНИЕ ЗАВЕРШЕНО")
 
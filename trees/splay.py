@@ -0,0 +1,118 @@
+from bst import Node, RotateUp
+
+
+class Splay_Node(RotateUp, Node):
+    """Самонастраивающееся (splay) дерево.
+
+    Каждый доступ поднимает узел в корень поворотами zig, zig-zig и zig-zag,
+    поэтому часто запрашиваемые ключи держатся у корня: при неравномерных
+    обращениях средняя глубина доступа меньше log n. Балансировочных полей
+    в узле нет, оценка O(log n) - амортизированная.
+
+    insert и delete возвращают новый корень. search тоже меняет дерево:
+    найденный узел становится корнем; при промахе корнем становится последний
+    пройденный узел, его можно получить через get_root()."""
+    __slots__ = ()
+    # Счетчики tree_stats.TreeStats, включаются через tree_stats.collect
+    _stats = None
+
+    def splay(self):
+        """Подъем self в корень, возвращает self"""
+        while self.parent is not None:
+            parent = self.parent
+            grandparent = parent.parent
+            if grandparent is None:
+                # zig
+                self._rotate_up()
+            elif (grandparent.left is parent) == (parent.left is self):
+                # zig-zig: сначала поворачивается родитель
+                parent._rotate_up()
+                self._rotate_up()
+            else:
+                # zig-zag
+                self._rotate_up()
+                self._rotate_up()
+        return self
+
+    def _descend(self, key):
+        """(узел с ключом или None, последний пройденный узел)"""
+        node = self
+        while True:
+            if key == node.key:
+                return node, node
+            child = node.left if key < node.key else node.right
+            if child is None:
+                return None, node
+            node = child
+
+    def search(self, key):
+        found, last = self._descend(key)
+        last.splay()
+        return found
+
+    def insert(self, key):
+        found, last = self._descend(key)
+        if found is not None:
+            return found.splay()
+        node = type(self)(key, last)
+        if key < last.key:
+            last.left = node
+        else:
+            last.right = node
+        return node.splay()
+
+    def delete(self, key):
+        """Удаление ключа, возвращает новый корень (None, если дерево опустело)"""
+        found, last = self._descend(key)
+        if found is None:
+            return last.splay()
+        found.splay()
+
+        left, right = found.left, found.right
+        found.left = found.right = None
+        if left is None:
+            if right is not None:
+                right.parent = None
+            return right
+        left.parent = None
+        if right is None:
+            return left
+
+        # Максимум левого поддерева после подъема не имеет правого ребенка
+        root = left
+        while root.right is not None:
+            root = root.right
+        root.splay()
+        root.right = right
+        right.parent = root
+        return root
+
+
+def test_splay():
+    print("\n" + "=" * 50)
+    print("ТЕСТ SPLAY ДЕРЕВА")
+    print("=" * 50)
+
+    keys = [50, 30, 70, 20, 40, 60, 80, 10, 90]
+    root = Splay_Node(keys[0])
+    for key in keys[1:]:
+        root = root.insert(key)
+    print(f"1. Вставлены {keys}, корень - последний вставленный ключ: {root.key}")
+
+    found = root.search(40)
+    root = found if found is not None else root.get_root()
+    print(f"2. После поиска 40 корень: {root.key}, глубина 40 теперь 0")
+
+    for key in [50, 10, 100]:
+        root = root.delete(key)
+    inorder_result = root.inorder(root)
+    print(f"3. После удаления 50, 10 и отсутствующего 100: {inorder_result}")
+    if inorder_result == sorted(set(keys) - {50, 10}):
+        print("    Дерево корректно отсортировано")
+    else:
+        print("    Нарушена сортировка дерева")
+    return root
+
+
+if __name__ == "__main__":
+    test_splay()
@@ -0,0 +1,215 @@
+"""Проверка инвариантов деревьев без рекурсии.
+
+validate(root) за один проход проверяет порядок ключей, ссылки parent,
+а также высоты и баланс у AVL дерева, цвета и черную высоту у
+красно-черного или ранги у WAVL. Вид дерева определяется по полям узла:
+color - красно-черное, get_balance - AVL, целое поле rank - WAVL, иначе
+проверяются только порядок и ссылки.
+
+PathValidator проверяет только пути к ключам, которые менялись с прошлой
+проверки, и раз в full_every проверок - все дерево."""
+
+RED = True
+
+
+def _kind(root):
+    if hasattr(root, "color"):
+        return "rb"
+    if hasattr(root, "get_balance"):
+        return "avl"
+    # У деревьев с порядковыми статистиками rank - метод, у WAVL - число
+    if isinstance(getattr(root, "rank", None), int):
+        return "wavl"
+    return "bst"
+
+
+def _check_node(node, lo, hi, black_depth, expected_black, kind, violations):
+    """Локальные инварианты node: ключ внутри (lo, hi), ссылки детей на node,
+    высота и баланс (AVL), красный-красный и черная глубина NIL (RB),
+    разности рангов 1 или 2 и ранг 0 у листьев (WAVL).
+    black_depth - число черных узлов от корня до node включительно."""
+    key = node.key
+    if (lo is not None and not lo < key) or (hi is not None and not key < hi):
+        violations.append(f"Узел {key}: нарушен порядок ключей")
+
+    left, right = node.left, node.right
+    for child in (left, right):
+        if child is None:
+            if kind == "rb" and black_depth != expected_black:
+                violations.append(f"Узел {key}: черная высота {black_depth} у NIL, ожидалась {expected_black}")
+            continue
+        if child.parent is not node:
+            violations.append(f"Узел {key}: у ребенка {child.key} неверная ссылка parent")
+        if kind == "rb" and node.color == RED and child.color == RED:
+            violations.append(f"Узел {key}: красный узел с красным ребенком {child.key}")
+
+    if kind == "wavl":
+        for child in (left, right):
+            difference = node.rank - (child.rank if child is not None else -1)
+            if difference not in (1, 2):
+                violations.append(f"Узел {key}: разность рангов {difference} с ребенком "
+                                  f"{child.key if child is not None else 'NIL'}")
+        if left is None and right is None and node.rank != 0:
+            violations.append(f"Узел {key}: лист с рангом {node.rank}")
+
+    if kind == "avl":
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        if node.height != max(left_height, right_height) + 1:
+            violations.append(f"Узел {key}: хранится высота {node.height}, "
+                              f"должна быть {max(left_height, right_height) + 1}")
+        if abs(left_height - right_height) > 1:
+            violations.append(f"Узел {key}: несбалансирован (баланс: {left_height - right_height})")
+
+
+def _child_entries(node, lo, hi, black_depth):
+    """Записи (узел, lo, hi, черная глубина) для детей node"""
+    entry = (node, lo, hi, black_depth)
+    return [child for child in (_step(entry, True), _step(entry, False)) if child is not None]
+
+
+def _step(entry, left):
+    """Запись для левого или правого ребенка узла из entry, None если его нет"""
+    node, lo, hi, black_depth = entry
+    child = node.left if left else node.right
+    if child is None:
+        return None
+    if left:
+        return child, lo, node.key, black_depth + _is_black(child)
+    return child, node.key, hi, black_depth + _is_black(child)
+
+
+def _is_black(node):
+    return 0 if getattr(node, "color", RED) == RED else 1
+
+
+def _check_root(root, kind, violations):
+    if root.parent is not None:
+        violations.append(f"Узел {root.key}: корень с непустым parent")
+    if kind == "rb" and root.color == RED:
+        violations.append("Корень не черный")
+
+
+def black_height(root):
+    """Число черных узлов на пути от root до любого NIL, -1 если пути различаются"""
+    if root is None:
+        return 0
+    result = None
+    stack = [(root, _is_black(root))]
+    while stack:
+        node, depth = stack.pop()
+        for child in (node.left, node.right):
+            if child is None:
+                if result is None:
+                    result = depth
+                elif depth != result:
+                    return -1
+            else:
+                stack.append((child, depth + _is_black(child)))
+    return result
+
+
+def _leftmost_black_depth(root):
+    depth = 0
+    node = root
+    while node is not None:
+        depth += _is_black(node)
+        node = node.left
+    return depth
+
+
+def validate(root):
+    """Полная проверка дерева за O(n), возвращает список нарушений (пустой - дерево корректно)"""
+    violations = []
+    if root is None:
+        return violations
+    kind = _kind(root)
+    _check_root(root, kind, violations)
+    expected_black = _leftmost_black_depth(root)
+    stack = [(root, None, None, _is_black(root))]
+    while stack:
+        node, lo, hi, black_depth = stack.pop()
+        _check_node(node, lo, hi, black_depth, expected_black, kind, violations)
+        stack.extend(_child_entries(node, lo, hi, black_depth))
+    return violations
+
+
+class PathValidator:
+    """Проверка только затронутых путей для длинных стресс-прогонов.
+
+    После каждой операции с ключом вызывается touch(key), check(root)
+    проверяет узлы на пути поиска каждого такого ключа и их детей, а также
+    путь к преемнику найденного узла: удаление через преемника и повороты
+    меняют только эти узлы. Черная высота NIL сравнивается с высотой самого
+    левого пути. Такая проверка стоит O(k log n) для k ключей, но ловит лишь
+    локальные нарушения, поэтому каждая full_every-я проверка (если задано)
+    проходит все дерево через validate."""
+
+    def __init__(self, full_every=None):
+        self.full_every = full_every
+        self.checks = 0
+        self.full_checks = 0
+        self._touched = set()
+
+    def touch(self, key):
+        self._touched.add(key)
+
+    def check(self, root):
+        """Список нарушений на затронутых путях (или во всем дереве при полной проверке)"""
+        touched, self._touched = self._touched, set()
+        self.checks += 1
+        if self.full_every and self.checks % self.full_every == 0:
+            self.full_checks += 1
+            return validate(root)
+
+        violations = []
+        if root is None:
+            return violations
+        kind = _kind(root)
+        _check_root(root, kind, violations)
+        expected_black = _leftmost_black_depth(root)
+        rb = kind == "rb"
+        seen = set()
+
+        def visit(node, lo, hi, black_depth):
+            # Узел пути и его дети проверяются один раз за вызов check
+            if id(node) not in seen:
+                seen.add(id(node))
+                _check_node(node, lo, hi, black_depth, expected_black, kind, violations)
+            left, right = node.left, node.right
+            if left is not None and id(left) not in seen:
+                seen.add(id(left))
+                _check_node(left, lo, node.key, black_depth + (rb and not left.color),
+                            expected_black, kind, violations)
+            if right is not None and id(right) not in seen:
+                seen.add(id(right))
+                _check_node(right, node.key, hi, black_depth + (rb and not right.color),
+                            expected_black, kind, violations)
+
+        for key in sorted(touched):
+            node, lo, hi, black_depth = root, None, None, _is_black(root)
+            # Последний узел пути, где поиск ушел влево или нашел key
+            successor = None
+            while node is not None:
+                visit(node, lo, hi, black_depth)
+                if key == node.key:
+                    successor = node, hi, black_depth
+                    break
+                if key < node.key:
+                    successor = node, hi, black_depth
+                    node, hi = node.left, node.key
+                else:
+                    node, lo = node.right, node.key
+                if node is not None:
+                    black_depth += rb and not node.color
+
+            # Путь от преемника: его правый ребенок и дальше влево до конца
+            if successor is None:
+                continue
+            node, hi, black_depth = successor
+            node, lo = node.right, node.key
+            while node is not None:
+                black_depth += rb and not node.color
+                visit(node, lo, hi, black_depth)
+                node, hi = node.left, node.key
+        return violations
@@ -0,0 +1,168 @@
+import mmap
+import struct
+from array import array
+
+# Формат файла (порядок байт - как у машины, на которой записан файл):
+#   заголовок HEADER: сигнатура, версия, вид дерева, тип ключа, число узлов
+#   ключи в прямом порядке обхода (preorder), по 8 байт ('q' или 'd')
+#   AVL: высота каждого узла, 1 байт на узел, в том же порядке
+#   WAVL: ранг каждого узла, 1 байт на узел, в том же порядке
+#   RB: цвет каждого узла, 1 бит на узел (1 - красный), в том же порядке
+# BST с различными ключами однозначно восстанавливается по preorder, поэтому
+# структуру дерева отдельно хранить не нужно.
+MAGIC = b"TREE"
+VERSION = 1
+HEADER = struct.Struct("=4sBBcxQ")
+
+KIND_BST = 0
+KIND_AVL = 1
+KIND_RB = 2
+KIND_WAVL = 3
+
+
+def preorder_nodes(root):
+    """Узлы в прямом порядке обхода - в этом порядке они лежат в файле"""
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+
+
+def dump_tree(root, path, node_class):
+    kind = node_class._FILE_KIND
+    if kind is None:
+        raise TypeError(f"{node_class.__name__} не поддерживает сохранение в файл")
+
+    nodes = list(preorder_nodes(root))
+    try:
+        keys = array("q", (node.key for node in nodes))
+    except TypeError:
+        keys = array("d", (node.key for node in nodes))
+    except OverflowError as error:
+        # В double такие ключи округлятся и могут совпасть, поэтому не сохраняем
+        raise ValueError(f"{path}: целые ключи должны помещаться в 64 бита со знаком") from error
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, kind, keys.typecode.encode(), len(nodes)))
+        keys.tofile(f)
+        if kind == KIND_AVL:
+            f.write(bytes(node.height for node in nodes))
+        elif kind == KIND_WAVL:
+            f.write(bytes(node.rank for node in nodes))
+        elif kind == KIND_RB:
+            bits = bytearray((len(nodes) + 7) // 8)
+            for i, node in enumerate(nodes):
+                if node.color == node_class.RED:
+                    bits[i >> 3] |= 1 << (i & 7)
+            f.write(bits)
+
+
+def _open_mapped(path):
+    """mmap файла и разбор заголовка: (mmap, вид дерева, ключи как memoryview, смещение за ключами)"""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, kind, typecode, count = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or version != VERSION:
+        mapped.close()
+        raise ValueError(f"{path}: не файл дерева или неподдерживаемая версия")
+    keys_end = HEADER.size + 8 * count
+    keys = memoryview(mapped)[HEADER.size:keys_end].cast(typecode.decode())
+    return mapped, kind, keys, keys_end
+
+
+def load_tree(node_class, path):
+    """Восстановление дерева той же формы за O(n) прямо из отображенного файла"""
+    mapped, kind, keys, keys_end = _open_mapped(path)
+    try:
+        if kind != node_class._FILE_KIND:
+            raise ValueError(f"{path}: дерево другого вида, чем {node_class.__name__}")
+        extra = memoryview(mapped)[keys_end:]
+        try:
+            return _build_from_preorder(node_class, kind, keys, extra)
+        finally:
+            extra.release()
+    finally:
+        keys.release()
+        mapped.close()
+
+
+def _build_from_preorder(node_class, kind, keys, extra):
+    root = None
+    # Стек - правый край уже построенной части: узлы, которые еще могут получить правого ребенка
+    stack = []
+    for i, key in enumerate(keys):
+        if kind == KIND_RB:
+            red = extra[i >> 3] >> (i & 7) & 1
+            node = node_class(key, None, node_class.RED if red else node_class.BLACK)
+        else:
+            node = node_class(key)
+            if kind == KIND_AVL:
+                node.height = extra[i]
+            elif kind == KIND_WAVL:
+                node.rank = extra[i]
+
+        if root is None:
+            root = node
+        elif key < stack[-1].key:
+            node.parent = stack[-1]
+            node.parent.left = node
+        else:
+            parent = stack.pop()
+            while stack and stack[-1].key < key:
+                parent = stack.pop()
+            node.parent = parent
+            parent.right = node
+        stack.append(node)
+    return root
+
+
+class MappedTree:
+    """Дерево только для чтения прямо из файла dump, без создания узлов.
+
+    В preorder за корнем отрезка идут ключи левого поддерева, потом правого,
+    поэтому границу между ними можно найти двоичным поиском. Поиск ключа
+    стоит O(h log n) сравнений."""
+
+    def __init__(self, path):
+        self._mapped, self.kind, self._keys, _ = _open_mapped(path)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, key):
+        """Есть ли ключ в дереве"""
+        keys = self._keys
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            root_key = keys[lo]
+            if key == root_key:
+                return True
+            a, b = lo + 1, hi
+            while a < b:
+                mid = (a + b) // 2
+                if keys[mid] > root_key:
+                    b = mid
+                else:
+                    a = mid + 1
+            if key < root_key:
+                lo, hi = lo + 1, a
+            else:
+                lo = a
+        return False
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def close(self):
+        self._keys.release()
+        self._mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
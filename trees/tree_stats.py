@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from functools import total_ordering
+
+_MISSING = object()
+
+
+class TreeStats:
+    """Счетчики работы алгоритмов балансировки за один прогон.
+
+    Повороты, перекрашивания и итерации цикла fix_insertion считают сами
+    AVL_Node и RB_Node, если классу назначен объект счетчиков (см. collect).
+    По умолчанию у классов _stats = None и каждая точка подсчета стоит одну
+    проверку на None. Сравнения ключей считаются без участия деревьев:
+    ключи заворачиваются в CountingKey через wrap_keys."""
+    __slots__ = ("comparisons", "rotations", "recolors", "fixup_iterations", "rebalances")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.comparisons = 0
+        self.rotations = 0
+        # Только RB: перекрашивания и итерации цикла восстановления после вставки
+        self.recolors = 0
+        self.fixup_iterations = 0
+        # Только AVL: вызовы rebalance, которые выполнили поворот
+        self.rebalances = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in TreeStats.__slots__}
+
+    def wrap_keys(self, keys):
+        """Ключи, сравнения которых попадают в self.comparisons"""
+        return [CountingKey(key, self) for key in keys]
+
+
+@total_ordering
+class CountingKey:
+    """Ключ-обертка: каждое сравнение с другим ключом увеличивает stats.comparisons"""
+    __slots__ = ("key", "stats")
+
+    def __init__(self, key, stats):
+        self.key = key
+        self.stats = stats
+
+    def __eq__(self, other):
+        self.stats.comparisons += 1
+        return self.key == (other.key if isinstance(other, CountingKey) else other)
+
+    def __lt__(self, other):
+        self.stats.comparisons += 1
+        return self.key < (other.key if isinstance(other, CountingKey) else other)
+
+    def __gt__(self, other):
+        self.stats.comparisons += 1
+        return self.key > (other.key if isinstance(other, CountingKey) else other)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return repr(self.key)
+
+
+@contextmanager
+def collect(*node_classes, stats=None):
+    """Включение счетчиков у классов узлов на время блока with:
+
+        with collect(AVL_Node, RB_Node) as stats:
+            ...
+        stats.as_dict()
+    """
+    stats = TreeStats() if stats is None else stats
+    # Собственные значения классов: _MISSING - значение наследуется от базового
+    previous = [cls.__dict__.get("_stats", _MISSING) for cls in node_classes]
+    for cls in node_classes:
+        cls._stats = stats
+    try:
+        yield stats
+    finally:
+        for cls, old in zip(node_classes, previous):
+            if old is _MISSING:
+                del cls._stats
+            else:
+                cls._stats = old
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import tree_check
+import tree_io
+from bst import Node, RotateUp
+
+
+def _rank(node):
+    # У отсутствующего ребенка ранг -1
+    return node.rank if node is not None else -1
+
+
+class WAVL_Node(RotateUp, Node):
+    """Weak AVL (WAVL) дерево: узел хранит ранг, разность рангов родителя
+    и ребенка - 1 или 2, у листьев ранг 0.
+
+    Без удалений WAVL дерево совпадает с AVL: та же перебалансировка после
+    вставки. Удаление же обходится понижениями рангов и не больше чем одним
+    (одинарным или двойным) поворотом, тогда как AVL может поворачивать
+    на каждом уровне. Высота не больше 2 log2(n), как у красно-черного дерева."""
+    __slots__ = ("rank",)
+    _FILE_KIND = tree_io.KIND_WAVL
+    # Счетчики tree_stats.TreeStats, включаются через tree_stats.collect
+    _stats = None
+
+    def __init__(self, key, parent=None):
+        super().__init__(key, parent)
+        self.rank = 0
+
+    def insert(self, key):
+        """Вставка ключа без рекурсии, возвращает корень дерева"""
+        node = self
+        while True:
+            if key == node.key:
+                return self
+            child = node.left if key < node.key else node.right
+            if child is None:
+                break
+            node = child
+        x = type(self)(key, node)
+        if key < node.key:
+            node.left = x
+        else:
+            node.right = x
+
+        # Разность рангов 0 между x и родителем поднимается вверх повышениями
+        while x.parent is not None and x.parent.rank == x.rank:
+            parent = x.parent
+            sibling = parent.right if parent.left is x else parent.left
+            if parent.rank - _rank(sibling) == 1:
+                parent.rank += 1
+                x = parent
+                continue
+
+            # Брат - 2-ребенок: один или два поворота завершают вставку
+            inner = x.right if parent.left is x else x.left
+            if inner is None or x.rank - inner.rank == 2:
+                x._rotate_up()
+                parent.rank -= 1
+            else:
+                inner._rotate_up()
+                inner._rotate_up()
+                inner.rank += 1
+                x.rank -= 1
+                parent.rank -= 1
+            break
+
+        return self.get_root()
+
+    def search(self, key):
+        node = self
+        while node is not None and key != node.key:
+            node = node.left if key < node.key else node.right
+        return node
+
+    def delete(self, key):
+        """Удаление ключа без рекурсии, возвращает корень дерева (None, если оно опустело)"""
+        node = self.search(key)
+        if node is None:
+            return self
+
+        # У узла с двумя детьми забираем ключ преемника и удаляем преемника
+        if node.left is not None and node.right is not None:
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            node.key = successor.key
+            node = successor
+
+        x = node.left if node.left is not None else node.right
+        parent = node.parent
+        if x is not None:
+            x.parent = parent
+        if parent is None:
+            return x
+        if parent.left is node:
+            parent.left = x
+        else:
+            parent.right = x
+        node.parent = None
+        self._rebalance_delete(x, parent)
+        return parent.get_root()
+
+    @staticmethod
+    def _rebalance_delete(x, parent):
+        """Восстановление рангов после удаления: на месте x (может быть None)
+        под parent разность рангов могла стать 3, или parent стал листом ранга 1"""
+        if parent.left is None and parent.right is None and parent.rank == 1:
+            # Лист 2,2 запрещен - понижаем его, разность над ним может стать 3
+            parent.rank = 0
+            x = parent
+            parent = x.parent
+
+        while parent is not None and parent.rank - _rank(x) == 3:
+            sibling = parent.right if parent.left is x else parent.left
+            if parent.rank - sibling.rank == 2:
+                parent.rank -= 1
+            elif sibling.rank - _rank(sibling.left) == 2 and sibling.rank - _rank(sibling.right) == 2:
+                parent.rank -= 1
+                sibling.rank -= 1
+            else:
+                # Брат - 1-ребенок с 1-ребенком: поворот, дальше подниматься не нужно
+                if parent.left is x:
+                    outer, inner = sibling.right, sibling.left
+                else:
+                    outer, inner = sibling.left, sibling.right
+                if sibling.rank - _rank(outer) == 1:
+                    sibling._rotate_up()
+                    sibling.rank += 1
+                    parent.rank -= 1
+                    if parent.left is None and parent.right is None:
+                        parent.rank -= 1
+                else:
+                    inner._rotate_up()
+                    inner._rotate_up()
+                    inner.rank += 2
+                    sibling.rank -= 1
+                    parent.rank -= 2
+                return
+            x = parent
+            parent = x.parent
+
+
+def test_wavl():
+    print("\n" + "=" * 50)
+    print("ТЕСТ WAVL ДЕРЕВА")
+    print("=" * 50)
+
+    root = WAVL_Node(1)
+    for key in range(2, 101):
+        root = root.insert(key)
+    print(f"1. Вставлены ключи 1..100 по возрастанию: корень {root.key}, ранг {root.rank}, "
+          f"высота {root.height(root)}")
+
+    for key in range(1, 101, 2):
+        root = root.delete(key)
+    print(f"2. Удалены нечетные ключи: корень {root.key}, ранг {root.rank}, высота {root.height(root)}")
+
+    if not tree_check.validate(root) and root.inorder(root) == list(range(2, 101, 2)):
+        print("    Ранги корректны, дерево отсортировано")
+    else:
+        print("    Нарушены ранги или сортировка")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "wavl.tree")
+        root.dump(root, path)
+        loaded = WAVL_Node.load(path)
+    saved = [(node.key, node.rank) for node in tree_io.preorder_nodes(root)]
+    restored = [(node.key, node.rank) for node in tree_io.preorder_nodes(loaded)]
+    if saved == restored and not tree_check.validate(loaded):
+        print("3. После dump/load дерево той же формы, ранги сохранены")
+    else:
+        print("3. После dump/load форма дерева или ранги изменились")
+    return root
+
+
+if __name__ == "__main__":
+    test_wavl()